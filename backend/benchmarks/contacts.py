@@ -0,0 +1,72 @@
+# Throughput of contact extraction on recorded about pages: the old full-page regex
+# scan versus the JSON-field scanner.
+#
+#   python -m backend.benchmarks.contacts about_pages/*.html [--rounds 5]
+import argparse
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from backend.scraper.contacts import about_fields, extract_contacts
+from backend.scraper.initial_data import extract_initial_data
+
+LEGACY_EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+LEGACY_ALT = re.compile(
+    r"([A-Za-z0-9._%+-]+)\s*\[?at\]?\s*([A-Za-z0-9.-]+)\s*\[?dot\]?\s*([A-Za-z]{2,})",
+    re.IGNORECASE,
+)
+LEGACY_TELEGRAM = re.compile(r"(?:https?://)?t\.me/([A-Za-z0-9_]{4,})", re.IGNORECASE)
+
+
+def legacy_extract(page: bytes):
+    text = page.decode("utf-8", errors="replace")
+    soup = BeautifulSoup(text, "html.parser")
+    description = " ".join(meta.get("content") for meta in soup.find_all("meta", {"name": "description"}))
+    links = " ".join(a.get("href") for a in soup.find_all("a", href=True))
+    blob = text + " " + description
+    emails = {match.group(0) for match in LEGACY_EMAIL.finditer(blob)}
+    emails.update(f"{m.group(1)}@{m.group(2)}.{m.group(3)}" for m in LEGACY_ALT.finditer(blob))
+    telegram = LEGACY_TELEGRAM.search(links + " " + description)
+    return sorted(emails), telegram.group(1) if telegram else None
+
+
+def scanner_extract(page: bytes):
+    return extract_contacts(about_fields(extract_initial_data(page)))
+
+
+def _time(fn, pages, rounds):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for page in pages:
+            fn(page)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pages", nargs="+", type=Path)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    pages = [path.read_bytes() for path in args.pages]
+    megabytes = sum(len(page) for page in pages) / 1_000_000
+
+    legacy = _time(legacy_extract, pages, args.rounds)
+    scanner = _time(scanner_extract, pages, args.rounds)
+    print(f"{len(pages)} pages, {megabytes:.1f} MB, best of {args.rounds} rounds")
+    print(f"legacy:  {len(pages) / legacy:8.1f} pages/sec  {megabytes / legacy:7.1f} MB/s")
+    print(f"scanner: {len(pages) / scanner:8.1f} pages/sec  {megabytes / scanner:7.1f} MB/s  ({legacy / scanner:.1f}x)")
+    for path, page in zip(args.pages, pages):
+        old_emails, _ = legacy_extract(page)
+        new = scanner_extract(page)
+        dropped = sorted(set(old_emails) - set(new.emails))
+        if dropped:
+            print(f"{path.name}: legacy-only matches {dropped}")
+
+
+if __name__ == "__main__":
+    main()
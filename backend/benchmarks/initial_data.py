@@ -0,0 +1,47 @@
+# Compares the marker-based extractor with the BeautifulSoup path on recorded pages.
+#
+#   python -m backend.benchmarks.initial_data pages/*.html [--rounds 5]
+import argparse
+import time
+from pathlib import Path
+
+from backend.scraper.initial_data import INITIAL_DATA, PLAYER_RESPONSE, extract_json_fast, extract_json_soup
+
+
+def _time(fn, pages, name, rounds):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for page in pages:
+            fn(page, name)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pages", nargs="+", type=Path)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--name", choices=[INITIAL_DATA, PLAYER_RESPONSE], default=INITIAL_DATA)
+    args = parser.parse_args()
+
+    pages = [path.read_bytes() for path in args.pages]
+    total_mb = sum(len(page) for page in pages) / 1_000_000
+    mismatches = [
+        str(path)
+        for path, page in zip(args.pages, pages)
+        if extract_json_fast(page, args.name) != extract_json_soup(page, args.name)
+    ]
+
+    soup = _time(extract_json_soup, pages, args.name, args.rounds)
+    fast = _time(extract_json_fast, pages, args.name, args.rounds)
+    print(f"{len(pages)} pages, {total_mb:.1f} MB, best of {args.rounds} rounds")
+    print(f"soup: {soup * 1000 / len(pages):8.2f} ms/page")
+    print(f"fast: {fast * 1000 / len(pages):8.2f} ms/page  ({soup / fast:.1f}x)")
+    if mismatches:
+        print("outputs differ for: " + ", ".join(mismatches))
+
+
+if __name__ == "__main__":
+    main()
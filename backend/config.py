@@ -1,19 +1,85 @@
 from pydantic import BaseSettings, Field
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
     database_url: str = Field(default="sqlite+aiosqlite:///./harvester.db")
+    sqlite_performance_profile: bool = True
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64000
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_read_pool_size: int = 4
+    sqlite_pool_timeout: float = 10.0
     cors_origins: List[str] = Field(default_factory=lambda: ["http://localhost:5173"])
     min_subscribers: int = 1000
     min_longform_videos: int = 5
     max_last_upload_days: int = 30
     deny_languages: List[str] = Field(default_factory=list)
     discovery_page_size: int = 5
+    discovery_concurrency: int = 3
+    discovery_requests_per_hour: float = 1800.0
+    discovery_exploration: float = 0.5
+    discovery_yield_alpha: float = 0.3
+    discovery_cooldown_base: float = 600.0
+    discovery_cooldown_max: float = 86400.0
+    discovery_idle_sleep: float = 5.0
+    pipeline_queue_size: int = 500
+    pipeline_enrich_workers: int = 2
+    pipeline_enrich_batch: int = 25
+    pipeline_enrich_concurrency: int = 4
+    pipeline_drain_timeout: float = 60.0
+    approx_count_cap: int = 10000
+    stats_cache_ttl: float = 2.0
+    export_batch_size: int = 1000
+    import_chunk_size: int = 500
     user_agent: str = (
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
     )
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 20.0
+    http_http2: bool = False
+    http_per_host_limit: int = 6
+    http_retries: int = 3
+    rate_initial: float = 2.0
+    rate_min: float = 0.2
+    rate_max: float = 10.0
+    rate_increase: float = 0.05
+    rate_decrease: float = 0.5
+    rate_burst: float = 4.0
+    rate_max_pause: float = 300.0
+    enrich_concurrency: int = 8
+    enrich_workers: int = 2
+    enrich_claim_batch: int = 25
+    enrich_poll_interval: float = 2.0
+    job_lease_seconds: int = 180
+    lease_ttl: float = 60.0
+    events_interval: float = 1.0
+    events_keepalive: float = 15.0
+    events_recent_limit: int = 20
+    heartbeat_interval: float = 15.0
+    worker_timeout: float = 90.0
+    job_max_attempts: int = 3
+    refresh_requests_per_hour: int = 0
+    refresh_interval: float = 300.0
+    refresh_ttl_about_hours: float = 14 * 24
+    refresh_ttl_videos_hours: float = 48
+    refresh_ttl_descriptions_hours: float = 14 * 24
+    refresh_ttl_language_hours: float = 30 * 24
+    parse_executor: str = "process"
+    parse_workers: Optional[int] = None
+    innertube_client_version: str = "2.20240620.05.00"
+    http_replay_dir: Optional[str] = None
+    http_cache_path: Optional[str] = "./http_cache.db"
+    http_cache_max_bytes: int = 512 * 1024 * 1024
+    http_cache_offline: bool = False
+    http_cache_ttl_search: float = 3600.0
+    http_cache_ttl_about: float = 3 * 86400.0
+    http_cache_ttl_videos: float = 12 * 3600.0
+    http_cache_ttl_watch: float = 7 * 86400.0
 
     class Config:
         env_file = ".env"
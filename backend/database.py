@@ -2,19 +2,85 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import asyncio
+from backend import metrics
 from backend.config import get_settings
 
 settings = get_settings()
 
-engine = create_async_engine(settings.database_url, echo=False, future=True)
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_memory(url: str) -> bool:
+    return ":memory:" in url or url.rstrip("/").endswith(":")
+
+
+def _install_pragmas(target: Engine, read_only: bool = False):
+    @event.listens_for(target, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+PERFORMANCE_PROFILE = (
+    settings.sqlite_performance_profile
+    and _is_sqlite(settings.database_url)
+    and not _is_memory(settings.database_url)
+)
+
+
+def _create_engine(pool_size: int, max_overflow: int, read_only: bool = False):
+    if not PERFORMANCE_PROFILE:
+        return create_async_engine(settings.database_url, echo=False, future=True)
+    new_engine = create_async_engine(
+        settings.database_url,
+        echo=False,
+        future=True,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.sqlite_pool_timeout,
+    )
+    _install_pragmas(new_engine.sync_engine, read_only=read_only)
+    return new_engine
+
+
+# With the performance profile on, every write goes through a single pooled
+# connection so background jobs queue in-process instead of fighting over the
+# SQLite write lock; reads use their own pool and never block on writers (WAL).
+# Every other writer waits while a session holds that connection, so sessions
+# must not keep a transaction open across network I/O (scraping, request or
+# response streams): commit before awaiting the network. A writer that still
+# waits longer than sqlite_pool_timeout fails instead of queueing indefinitely.
+engine = _create_engine(pool_size=1, max_overflow=0)
+if PERFORMANCE_PROFILE:
+    read_engine = _create_engine(pool_size=settings.sqlite_read_pool_size, max_overflow=0, read_only=True)
+else:
+    read_engine = engine
+metrics.instrument_engine(engine.sync_engine, "write")
+if read_engine is not engine:
+    metrics.instrument_engine(read_engine.sync_engine, "read")
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
 Base = declarative_base()
 
 
 async def init_db():
+    from backend.migrations import run_migrations
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
 
 
 async def get_db():
@@ -25,5 +91,13 @@ async def get_db():
             await session.close()
 
 
+async def get_read_db():
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 def run_async(coro):
     return asyncio.get_event_loop().run_until_complete(coro)
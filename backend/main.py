@@ -2,28 +2,53 @@ import asyncio
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import select, func
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend import metrics
 from backend.config import Settings, get_settings
-from backend.database import get_db, init_db
+from backend.database import SessionLocal, get_db, get_read_db, init_db
 from backend.logging_config import logger
-from backend.models import Channel, DiscoveryState, Setting
+from backend.models import Channel, DiscoveryState, EnrichJob, Setting
+from backend.scraper.executor import shutdown_executor, start_executor
+from backend.scraper.http_client import close_client, open_client
+from backend.scraper.rate_limit import snapshot_all as rate_snapshot
+from backend.scraper.response_cache import close_response_cache, get_response_cache
 from backend.schemas import (
+    ChannelCreate,
+    ChannelPage,
     ChannelsQuery,
     ChannelRead,
     DiscoveryProgress,
     DiscoveryRequest,
+    EnrichJobProgress,
+    EnrichJobRead,
     EnrichSettings,
     EnrichmentRequest,
     ImportBundle,
     StatsResponse,
 )
+from backend.services.channel_query import (
+    apply_channel_filters,
+    apply_keyset,
+    approximate_total,
+    decode_cursor,
+    encode_cursor,
+)
 from backend.services.discovery import ensure_discovery_states, run_discovery_cycle
-from backend.services.enrichment import enrich_channels
+from backend.services.stats import cached_stats, invalidate_stats
+from backend.services.export import gzip_stream, iter_channel_rows
+from backend.services.importer import import_ndjson
+from backend.services.ingest import insert_new_channels
+from backend.services.job_queue import cancel_job, enrich_workers, job_progress, submit_enrich_job
+from backend.services.events import event_bus
 from backend.services.jobs import discovery_loop
+from backend.services.leases import WORKER_ID, cluster_status, heartbeat
+from backend.services.refresh import refresh_scheduler
 
 app = FastAPI(title="Crypto YouTube Harvester")
 settings = get_settings()
@@ -40,21 +65,34 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup():
     await init_db()
+    await open_client()
+    start_executor()
+    event_bus.gauge("queue_depth", lambda: discovery_loop.queue_depth)
+    event_bus.gauge("discovery_running", lambda: discovery_loop.running)
+    event_bus.gauge("current_keyword", lambda: discovery_loop.current_keyword)
+    await event_bus.start()
+    await heartbeat.start(_local_status)
+    await enrich_workers.start()
+    await refresh_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await discovery_loop.stop()
+    await refresh_scheduler.stop()
+    await enrich_workers.stop()
+    await heartbeat.stop()
+    await event_bus.stop()
+    await close_client()
+    close_response_cache()
+    shutdown_executor()
 
 
 @app.get("/api/stats", response_model=StatsResponse)
-async def stats(db: AsyncSession = Depends(get_db)):
-    total = (await db.execute(select(func.count(Channel.id)))).scalar()
-    active = (await db.execute(select(func.count(Channel.id)).where(Channel.status == "active"))).scalar()
-    blacklisted = (await db.execute(select(func.count(Channel.id)).where(Channel.status == "blacklisted"))).scalar()
-    archived = (await db.execute(select(func.count(Channel.id)).where(Channel.status == "archived"))).scalar()
+async def stats(db: AsyncSession = Depends(get_read_db)):
     return StatsResponse(
-        total=total or 0,
-        active=active or 0,
-        blacklisted=blacklisted or 0,
-        archived=archived or 0,
+        **await cached_stats(db),
         running_keyword=discovery_loop.current_keyword if discovery_loop.running else None,
-        last_run_at=None,
     )
 
 
@@ -68,71 +106,215 @@ async def list_channels(
     keyword: Optional[str] = None,
     page: int = 1,
     page_size: int = 25,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    stmt = select(Channel)
-    if status:
-        stmt = stmt.where(Channel.status == status)
-    if language:
-        stmt = stmt.where(Channel.language == language)
-    if has_email:
-        stmt = stmt.where(Channel.emails != None)
-    if has_telegram:
-        stmt = stmt.where(Channel.telegram != None)
-    if min_subscribers:
-        stmt = stmt.where(Channel.subscribers >= min_subscribers)
-    if keyword:
-        stmt = stmt.where(Channel.name.ilike(f"%{keyword}%"))
+    stmt = apply_channel_filters(
+        select(Channel),
+        status=status,
+        language=language,
+        has_email=has_email,
+        has_telegram=has_telegram,
+        min_subscribers=min_subscribers,
+        keyword=keyword,
+    )
     stmt = stmt.offset((page - 1) * page_size).limit(page_size)
     result = await db.execute(stmt)
     return result.scalars().all()
 
 
+async def _run_discovery_loop(keywords: List[str], enrich_settings: EnrichSettings, run_until_stopped: bool):
+    # The loop outlives the request, so it gets its own writer session.
+    try:
+        async with SessionLocal() as session:
+            await discovery_loop.start(
+                session,
+                keywords,
+                settings,
+                enrich_settings,
+                run_until_stopped=run_until_stopped,
+            )
+    except Exception:
+        logger.exception("discovery loop failed")
+
+
+@app.get("/api/channels/cursor", response_model=ChannelPage)
+async def list_channels_cursor(
+    status: Optional[str] = None,
+    language: Optional[str] = None,
+    has_email: bool = False,
+    has_telegram: bool = False,
+    min_subscribers: Optional[int] = None,
+    keyword: Optional[str] = None,
+    sort: str = Query("id", regex="^(id|subscribers|last_upload_at|created_at)$"),
+    order: str = Query("desc", regex="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    page_size: int = Query(25, ge=1, le=500),
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        after = decode_cursor(cursor, sort, order) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    filtered = apply_channel_filters(
+        select(Channel),
+        status=status,
+        language=language,
+        has_email=has_email,
+        has_telegram=has_telegram,
+        min_subscribers=min_subscribers,
+        keyword=keyword,
+        ranked=False,
+    )
+    stmt = apply_keyset(filtered, sort, order, after).limit(page_size + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, order, getattr(last, sort), last.id)
+    approx_total = None
+    if include_total:
+        unfiltered = not (status or language or has_email or has_telegram or min_subscribers or keyword)
+        approx_total = await approximate_total(db, filtered, unfiltered, settings.approx_count_cap)
+    return ChannelPage(items=rows, next_cursor=next_cursor, approx_total=approx_total)
+
+
 @app.post("/api/discovery/start")
 async def start_discovery(payload: DiscoveryRequest, db: AsyncSession = Depends(get_db)):
     await ensure_discovery_states(db, payload.keywords)
     enrich_settings = EnrichSettings()
+    if not discovery_loop.claim(payload.auto_enrich):
+        raise HTTPException(status_code=409, detail="discovery is running or still stopping")
     asyncio.create_task(
-        discovery_loop.start(
-            db,
-            payload.keywords,
-            settings,
-            enrich_settings,
-            run_until_stopped=payload.run_until_stopped,
-        )
+        _run_discovery_loop(payload.keywords, enrich_settings, payload.run_until_stopped)
     )
     return {"status": "started", "keywords": payload.keywords}
 
 
 @app.post("/api/discovery/stop")
 async def stop_discovery():
-    discovery_loop.stop()
-    return {"status": "stopped"}
+    # Returns once in-flight cycles have finished and queued channels are enriched.
+    await discovery_loop.stop()
+    return {"status": "stopped", "new_channels": discovery_loop.new_channels, "enriched": discovery_loop.enriched}
+
+
+def _local_status() -> dict:
+    # What this process reports to the worker registry on every heartbeat.
+    return {
+        "discovery_running": discovery_loop.running,
+        "current_keyword": discovery_loop.current_keyword,
+        "last_run_at": discovery_loop.last_run_at.isoformat() if discovery_loop.last_run_at else None,
+        "new_channels": event_bus.count("discovery.cycle.new_channels"),
+        "skipped": event_bus.count("discovery.cycle.skipped"),
+        "cycles": event_bus.count("discovery.cycle"),
+        "enriched": event_bus.count("enrich.channel.completed"),
+        "enrich_errors": event_bus.count("enrich.channel.error"),
+        "queue_depth": discovery_loop.queue_depth,
+        "refreshed": refresh_scheduler.refreshed,
+        "new_per_min": event_bus.rates.get("discovery.cycle.new_channels", 0.0),
+        "enriched_per_min": event_bus.rates.get("enrich.channel", 0.0),
+    }
+
+
+async def _workers_status(db: AsyncSession) -> dict:
+    # Registry rows are as old as the last heartbeat; this process reports live.
+    cluster = await cluster_status(db)
+    workers = [worker for worker in cluster["workers"] if worker["id"] != WORKER_ID]
+    workers.append(dict(_local_status(), id=WORKER_ID))
+    cluster["workers"] = workers
+    totals = {}
+    for worker in workers:
+        for key, value in worker.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                totals[key] = totals.get(key, 0) + value
+    cluster["totals"] = totals
+    return cluster
+
+
+@app.get("/api/cluster/status")
+async def workers_status(db: AsyncSession = Depends(get_read_db)):
+    return await _workers_status(db)
 
 
 @app.get("/api/discovery/progress", response_model=DiscoveryProgress)
-async def discovery_progress():
+async def discovery_progress(db: AsyncSession = Depends(get_read_db)):
+    cluster = await _workers_status(db)
+    runs = [worker["last_run_at"] for worker in cluster["workers"] if worker.get("last_run_at")]
+    in_flight = cluster["keywords_in_flight"]
+    totals = cluster["totals"]
     return DiscoveryProgress(
-        running=discovery_loop.running,
-        current_keyword=discovery_loop.current_keyword,
-        last_run_at=None,
-        new_channels=0,
+        running=any(worker.get("discovery_running") for worker in cluster["workers"]),
+        current_keyword=discovery_loop.current_keyword or (in_flight[0] if in_flight else None),
+        last_run_at=max(datetime.fromisoformat(run) for run in runs) if runs else None,
+        new_channels=int(totals.get("new_channels", 0)),
+        skipped=int(totals.get("skipped", 0)),
+        cycles=int(totals.get("cycles", 0)),
+        enriched=int(totals.get("enriched", 0)),
+        enrich_errors=int(totals.get("enrich_errors", 0)),
+        queue_depth=int(totals.get("queue_depth", 0)),
+        new_per_min=round(totals.get("new_per_min", 0.0), 2),
+        enriched_per_min=round(totals.get("enriched_per_min", 0.0), 2),
     )
 
 
+@app.get("/api/events")
+async def events(request: Request):
+    # Server-sent progress events, coalesced to one frame per events_interval.
+    return StreamingResponse(
+        event_bus.stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/discovery/keywords")
+async def discovery_keywords():
+    if discovery_loop.scheduler is None:
+        return []
+    return discovery_loop.scheduler.snapshot()
+
+
 @app.post("/api/enrich/start")
 async def start_enrichment(payload: EnrichmentRequest, db: AsyncSession = Depends(get_db)):
-    if payload.scope == "active":
-        stmt = await db.execute(select(Channel.id).where(Channel.status.in_(["new", "active"])))
-        ids = [row[0] for row in stmt.all()]
-    else:
-        ids = payload.channel_ids or []
-    result = await enrich_channels(db, ids, payload.settings)
-    return {"status": "completed", "results": result}
+    job = await submit_enrich_job(db, payload.settings, payload.scope, payload.channel_ids)
+    return {"status": job.status, "job_id": job.id, "total": job.total}
+
+
+@app.post("/api/jobs/enrich", response_model=EnrichJobRead)
+async def submit_job(payload: EnrichmentRequest, db: AsyncSession = Depends(get_db)):
+    return await submit_enrich_job(db, payload.settings, payload.scope, payload.channel_ids)
+
+
+async def _get_job(db: AsyncSession, job_id: int) -> EnrichJob:
+    job = await db.get(EnrichJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+
+@app.get("/api/jobs/{job_id}", response_model=EnrichJobRead)
+async def job_status(job_id: int, db: AsyncSession = Depends(get_read_db)):
+    return await _get_job(db, job_id)
+
+
+@app.get("/api/jobs/{job_id}/progress", response_model=EnrichJobProgress)
+async def job_progress_view(job_id: int, db: AsyncSession = Depends(get_read_db)):
+    return EnrichJobProgress(**await job_progress(db, await _get_job(db, job_id)))
+
+
+@app.post("/api/jobs/{job_id}/cancel", response_model=EnrichJobRead)
+async def cancel_job_view(job_id: int, db: AsyncSession = Depends(get_db)):
+    return await cancel_job(db, await _get_job(db, job_id))
+
+
+@app.get("/api/refresh/status")
+async def refresh_status():
+    return refresh_scheduler.snapshot()
 
 
 @app.get("/api/settings/enrich")
-async def get_enrich_settings(db: AsyncSession = Depends(get_db)):
+async def get_enrich_settings(db: AsyncSession = Depends(get_read_db)):
     stmt = await db.execute(select(Setting).where(Setting.key == "enrich"))
     setting = stmt.scalars().first()
     return setting.value if setting else {}
@@ -153,22 +335,83 @@ async def save_enrich_settings(payload: EnrichSettings, db: AsyncSession = Depen
 
 @app.post("/api/import/bundle")
 async def import_bundle(payload: ImportBundle, db: AsyncSession = Depends(get_db)):
-    count = 0
+    rows = []
+    rejected = 0
     for row in payload.data:
-        channel = Channel(**row)
-        db.add(channel)
-        count += 1
+        try:
+            rows.append(ChannelCreate.parse_obj(row).dict())
+        except ValidationError:
+            rejected += 1
+    result = await insert_new_channels(db, rows)
     await db.commit()
-    return {"imported": count}
+    invalidate_stats()
+    return {"imported": result["new"], "skipped": result["skipped"], "rejected": rejected}
+
+
+@app.post("/api/import/stream")
+async def import_stream(request: Request, gzip: bool = False, db: AsyncSession = Depends(get_db)):
+    gzipped = gzip or request.headers.get("content-encoding", "").lower() == "gzip"
+    return await import_ndjson(db, request.stream(), gzipped=gzipped)
 
 
 @app.get("/api/export/bundle")
-async def export_bundle(db: AsyncSession = Depends(get_db)):
+async def export_bundle(db: AsyncSession = Depends(get_read_db)):
     channels = (await db.execute(select(Channel))).scalars().all()
     data = [ChannelRead.from_orm(ch).dict() for ch in channels]
     return {"data": data, "meta": {"exported_at": datetime.utcnow().isoformat()}}
 
 
+@app.get("/api/export/stream")
+async def export_stream(
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    gzip: bool = False,
+    status: Optional[str] = None,
+    language: Optional[str] = None,
+    has_email: bool = False,
+    has_telegram: bool = False,
+    min_subscribers: Optional[int] = None,
+    keyword: Optional[str] = None,
+):
+    filters = {
+        "status": status,
+        "language": language,
+        "has_email": has_email,
+        "has_telegram": has_telegram,
+        "min_subscribers": min_subscribers,
+        "keyword": keyword,
+    }
+    body = iter_channel_rows(filters, format, settings.export_batch_size)
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    filename = f"channels-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    if gzip:
+        body = gzip_stream(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.get("/api/scraper/rate")
+async def scraper_rate():
+    return {"hosts": rate_snapshot()}
+
+
+@app.get("/api/scraper/cache")
+async def scraper_cache():
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return dict(await asyncio.to_thread(cache.stats), enabled=True)
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/health")
 async def health():
     return {"status": "ok"}
@@ -0,0 +1,221 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Minimal Prometheus-style instrumentation: counters and histograms with labels,
+# rendered in the text exposition format by render(). Recording is a dict lookup
+# and a few additions under a lock, cheap enough to leave on everywhere.
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_registry: Dict[str, "_Metric"] = {}
+# Observations made inside a parse worker process are collected here and shipped
+# back with the result (see capture/replay), since the worker's own registry is
+# never scraped.
+_captured: Optional[List[Tuple[str, Tuple[str, ...], float]]] = None
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def _record(self, key: Tuple[str, ...], value: float):
+        raise NotImplementedError
+
+    def _observe(self, labels: Dict[str, str], value: float):
+        key = self._key(labels)
+        if _captured is not None:
+            _captured.append((self.name, key, value))
+        else:
+            self._record(key, value)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        self._observe(labels, amount)
+
+    def _record(self, key: Tuple[str, ...], value: float):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value:g}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram._observe(self.labels, time.perf_counter() - self.started)
+        return False
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        self._observe(labels, value)
+
+    def time(self, **labels: str) -> _Timer:
+        return _Timer(self, labels)
+
+    def _record(self, key: Tuple[str, ...], value: float):
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            values = [(key, list(series)) for key, series in self._values.items()]
+        for key, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series[-1]:g}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+@contextmanager
+def capture():
+    # Used in parse worker processes: buffer observations instead of recording them.
+    global _captured
+    previous, _captured = _captured, []
+    try:
+        yield _captured
+    finally:
+        _captured = previous
+
+
+def replay(observations: List[Tuple[str, Tuple[str, ...], float]]):
+    for name, key, value in observations:
+        metric = _registry.get(name)
+        if metric is not None:
+            metric._record(key, value)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _registry.values():
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Scraper
+FETCH_SECONDS = Histogram("scraper_fetch_seconds", "HTTP request latency by page class.", ["url_class"])
+RESPONSE_BYTES = Histogram(
+    "scraper_response_bytes", "Decoded response body size by page class.", ["url_class"], buckets=BYTES_BUCKETS
+)
+RESPONSES = Counter("scraper_responses_total", "HTTP responses by page class and status.", ["url_class", "status"])
+THROTTLED = Counter(
+    "scraper_throttled_total", "429 and 5xx responses that slowed the host down.", ["url_class", "status"]
+)
+RETRIES = Counter("scraper_retries_total", "Requests sent again after a failed attempt.", ["url_class"])
+CACHE = Counter(
+    "scraper_cache_total", "Response cache lookups by result (hit, miss, revalidated, stale, offline_miss).", ["url_class", "result"]
+)
+
+# Parsing and CPU work
+PARSE_SECONDS = Histogram("parse_seconds", "Page parse time by stage (json, soup, renderers, walk).", ["stage"])
+LANGUAGE_SECONDS = Histogram("language_detect_seconds", "Language detection time per channel.", ["mode"])
+CPU_TASK_SECONDS = Histogram(
+    "cpu_task_seconds", "Wall time of executor tasks as seen by the event loop.", ["task"]
+)
+
+# Database
+DB_STATEMENT_SECONDS = Histogram("db_statement_seconds", "SQL statement execution time.", ["engine", "verb"])
+
+# Pipeline
+CHANNELS_PROCESSED = Counter(
+    "channels_processed_total", "Channels handled by discovery and enrichment, by outcome.", ["stage", "status"]
+)
+
+_VERBS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "CREATE"}
+
+
+def instrument_engine(sync_engine, name: str):
+    # Times every statement with the cursor execute events of the sync engine
+    # underneath an AsyncEngine. Labels by leading verb to keep cardinality fixed.
+    from sqlalchemy import event
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("metrics_started")
+        if not started:
+            return
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        DB_STATEMENT_SECONDS.observe(
+            time.perf_counter() - started.pop(), engine=name, verb=verb if verb in _VERBS else "OTHER"
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _failed(context):
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            started.pop()
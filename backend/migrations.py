@@ -0,0 +1,177 @@
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Connection
+
+from backend.logging_config import logger
+from backend.models import Channel, Setting
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+# Set at startup once the channels_fts table / counter triggers are known to exist.
+fts_available = False
+counters_available = False
+
+
+def _add_column(conn: Connection, table: str, column: str, ddl_type: str):
+    existing = {col["name"] for col in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}")
+
+
+def _create_indexes(conn: Connection, table):
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _m001_channel_description(conn: Connection):
+    _add_column(conn, "channels", "description", "TEXT")
+
+
+def _m002_channel_indexes(conn: Connection):
+    _create_indexes(conn, Channel.__table__)
+
+
+def _m003_channels_fts(conn: Connection):
+    if conn.dialect.name != "sqlite":
+        return
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS channels_fts USING fts5("
+        "name, description, emails, content='channels', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS channels_fts_ai AFTER INSERT ON channels BEGIN "
+        "INSERT INTO channels_fts(rowid, name, description, emails) "
+        "VALUES (new.id, new.name, new.description, new.emails); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS channels_fts_ad AFTER DELETE ON channels BEGIN "
+        "INSERT INTO channels_fts(channels_fts, rowid, name, description, emails) "
+        "VALUES ('delete', old.id, old.name, old.description, old.emails); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS channels_fts_au AFTER UPDATE OF name, description, emails ON channels BEGIN "
+        "INSERT INTO channels_fts(channels_fts, rowid, name, description, emails) "
+        "VALUES ('delete', old.id, old.name, old.description, old.emails); "
+        "INSERT INTO channels_fts(rowid, name, description, emails) "
+        "VALUES (new.id, new.name, new.description, new.emails); END"
+    )
+    conn.exec_driver_sql("INSERT INTO channels_fts(channels_fts) VALUES ('rebuild')")
+
+
+def _m004_sort_indexes(conn: Connection):
+    _create_indexes(conn, Channel.__table__)
+
+
+def _m005_channel_counters(conn: Connection):
+    if conn.dialect.name != "sqlite":
+        return
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS channel_counters_ai AFTER INSERT ON channels BEGIN "
+        "INSERT INTO channel_counters(status, count) VALUES (coalesce(new.status, ''), 1) "
+        "ON CONFLICT(status) DO UPDATE SET count = count + 1; END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS channel_counters_ad AFTER DELETE ON channels BEGIN "
+        "UPDATE channel_counters SET count = count - 1 WHERE status = coalesce(old.status, ''); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS channel_counters_au AFTER UPDATE OF status ON channels "
+        "WHEN old.status IS NOT new.status BEGIN "
+        "UPDATE channel_counters SET count = count - 1 WHERE status = coalesce(old.status, ''); "
+        "INSERT INTO channel_counters(status, count) VALUES (coalesce(new.status, ''), 1) "
+        "ON CONFLICT(status) DO UPDATE SET count = count + 1; END"
+    )
+    conn.exec_driver_sql("DELETE FROM channel_counters")
+    conn.exec_driver_sql(
+        "INSERT INTO channel_counters(status, count) "
+        "SELECT coalesce(status, ''), count(*) FROM channels GROUP BY coalesce(status, '')"
+    )
+
+
+def _m006_stage_freshness(conn: Connection):
+    for stage in ("about", "videos", "descriptions", "language"):
+        _add_column(conn, "channels", f"{stage}_checked_at", "DATETIME")
+        # Channels enriched before stages were tracked went through every stage.
+        conn.exec_driver_sql(
+            f"UPDATE channels SET {stage}_checked_at = last_checked_at WHERE {stage}_checked_at IS NULL"
+        )
+
+
+def _m007_keyword_scheduler(conn: Connection):
+    _add_column(conn, "discovery_state", "requests_made", "INTEGER DEFAULT 0")
+    _add_column(conn, "discovery_state", "yield_ewma", "FLOAT DEFAULT 0")
+    _add_column(conn, "discovery_state", "backoff_level", "INTEGER DEFAULT 0")
+    _add_column(conn, "discovery_state", "cooldown_until", "DATETIME")
+    # Start every keyword from its lifetime average so history is not thrown away.
+    conn.exec_driver_sql(
+        "UPDATE discovery_state SET requests_made = coalesce(runs_count, 0), "
+        "yield_ewma = CASE WHEN coalesce(runs_count, 0) > 0 "
+        "THEN 1.0 * coalesce(new_channels_found, 0) / runs_count ELSE 0 END"
+    )
+
+
+def _m008_task_owner(conn: Connection):
+    _add_column(conn, "enrich_tasks", "claimed_by", "VARCHAR")
+
+
+# Append only; each step must be safe to run against a database that create_all
+# has just built from the current models.
+MIGRATIONS = [
+    (1, _m001_channel_description),
+    (2, _m002_channel_indexes),
+    (3, _m003_channels_fts),
+    (4, _m004_sort_indexes),
+    (5, _m005_channel_counters),
+    (6, _m006_stage_freshness),
+    (7, _m007_keyword_scheduler),
+    (8, _m008_task_owner),
+]
+
+
+def _current_version(conn: Connection) -> int:
+    value = conn.execute(select(Setting.value).where(Setting.key == SCHEMA_VERSION_KEY)).scalar()
+    return int(value) if value else 0
+
+
+def _set_version(conn: Connection, version: int):
+    updated = conn.execute(
+        Setting.__table__.update().where(Setting.key == SCHEMA_VERSION_KEY).values(value=str(version))
+    )
+    if not updated.rowcount:
+        conn.execute(Setting.__table__.insert().values(key=SCHEMA_VERSION_KEY, value=str(version)))
+
+
+def _detect_fts(conn: Connection) -> bool:
+    if conn.dialect.name != "sqlite":
+        return False
+    found = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'channels_fts'"))
+    return found.first() is not None
+
+
+def _detect_counters(conn: Connection) -> bool:
+    if conn.dialect.name != "sqlite":
+        return False
+    found = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'channel_counters_ai'")
+    )
+    return found.first() is not None
+
+
+def run_migrations(conn: Connection):
+    global fts_available, counters_available
+    version = _current_version(conn)
+    for target, migration in MIGRATIONS:
+        if target <= version:
+            continue
+        try:
+            migration(conn)
+        except Exception as exc:
+            # FTS5 is an optional SQLite extension; everything else should apply cleanly.
+            if migration is _m003_channels_fts:
+                logger.warning("full-text search unavailable, keyword filter falls back to LIKE: %s", exc)
+            else:
+                raise
+        _set_version(conn, target)
+        logger.info("applied schema migration %s (%s)", target, migration.__name__)
+    fts_available = _detect_fts(conn)
+    counters_available = _detect_counters(conn)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import JSON
 from sqlalchemy.sql import func
@@ -8,11 +8,36 @@ from backend.database import Base
 
 class Channel(Base):
     __tablename__ = "channels"
+    # Matched to the /api/channels filter combinations; emails/telegram are
+    # partial indexes since the UI only ever asks for "has one".
+    __table_args__ = (
+        Index("ix_channels_status_subscribers", "status", "subscribers"),
+        Index("ix_channels_status_language_subscribers", "status", "language", "subscribers"),
+        Index("ix_channels_language_subscribers", "language", "subscribers"),
+        Index("ix_channels_subscribers", "subscribers"),
+        Index("ix_channels_last_upload_at", "last_upload_at"),
+        Index("ix_channels_created_at", "created_at"),
+        Index(
+            "ix_channels_has_email",
+            "status",
+            "subscribers",
+            sqlite_where=text("emails IS NOT NULL"),
+            postgresql_where=text("emails IS NOT NULL"),
+        ),
+        Index(
+            "ix_channels_has_telegram",
+            "status",
+            "subscribers",
+            sqlite_where=text("telegram IS NOT NULL"),
+            postgresql_where=text("telegram IS NOT NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     youtube_channel_id = Column(String, unique=True, nullable=False, index=True)
     name = Column(String)
     url = Column(String)
+    description = Column(Text)
     subscribers = Column(Integer)
     language = Column(String)
     emails = Column(Text)
@@ -20,11 +45,24 @@ class Channel(Base):
     status = Column(String, default="new")
     last_upload_at = Column(DateTime)
     last_checked_at = Column(DateTime)
+    # When each enrichment stage last ran, so refreshes can redo only stale stages.
+    about_checked_at = Column(DateTime)
+    videos_checked_at = Column(DateTime)
+    descriptions_checked_at = Column(DateTime)
+    language_checked_at = Column(DateTime)
     last_discovered_keyword = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class ChannelCounter(Base):
+    # Row count per channel status, maintained by triggers on channels (see migrations).
+    __tablename__ = "channel_counters"
+
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
 class DiscoveryState(Base):
     __tablename__ = "discovery_state"
 
@@ -36,6 +74,12 @@ class DiscoveryState(Base):
     exhausted = Column(Boolean, default=False)
     last_run_at = Column(DateTime)
     video_no_new_pages = Column(Integer, default=0)
+    # Keyword scheduler state: smoothed new channels per request, and an
+    # exponential cooldown for keywords that have run dry.
+    requests_made = Column(Integer, default=0)
+    yield_ewma = Column(Float, default=0.0)
+    backoff_level = Column(Integer, default=0)
+    cooldown_until = Column(DateTime)
 
 
 class Setting(Base):
@@ -43,3 +87,60 @@ class Setting(Base):
 
     key = Column(String, primary_key=True)
     value = Column(Text)
+
+
+class EnrichJob(Base):
+    __tablename__ = "enrich_jobs"
+
+    id = Column(Integer, primary_key=True)
+    status = Column(String, default="queued", index=True)
+    scope = Column(String)
+    settings = Column(Text)
+    total = Column(Integer, default=0)
+    completed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    cancel_requested = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+
+class EnrichTask(Base):
+    __tablename__ = "enrich_tasks"
+    __table_args__ = (
+        Index("ix_enrich_tasks_status_id", "status", "id"),
+        Index("ix_enrich_tasks_job_status", "job_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, nullable=False)
+    channel_id = Column(Integer, nullable=False)
+    status = Column(String, default="pending")
+    attempts = Column(Integer, default=0)
+    error = Column(Text)
+    claimed_at = Column(DateTime)
+    claimed_by = Column(String)
+    finished_at = Column(DateTime)
+
+
+class Lease(Base):
+    # Exclusive, expiring claim on a shared resource ("keyword:<kw>",
+    # "channel:<id>"), kept alive by the owner's heartbeat.
+    __tablename__ = "leases"
+
+    resource = Column(String, primary_key=True)
+    owner = Column(String, nullable=False, index=True)
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class Worker(Base):
+    # One row per running process; status is the JSON the process last reported.
+    __tablename__ = "workers"
+
+    id = Column(String, primary_key=True)
+    hostname = Column(String)
+    pid = Column(Integer)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    heartbeat_at = Column(DateTime, index=True)
+    status = Column(Text)
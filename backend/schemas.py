@@ -7,6 +7,7 @@ class ChannelBase(BaseModel):
     youtube_channel_id: str
     name: Optional[str]
     url: Optional[str]
+    description: Optional[str]
     subscribers: Optional[int]
     language: Optional[str]
     emails: Optional[str]
@@ -21,6 +22,12 @@ class ChannelCreate(ChannelBase):
     pass
 
 
+class ChannelImport(ChannelBase):
+    # Accepts rows from the streaming export; `id` is ignored, timestamps are kept.
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
 class ChannelRead(ChannelBase):
     id: int
     created_at: datetime
@@ -30,6 +37,12 @@ class ChannelRead(ChannelBase):
         orm_mode = True
 
 
+class ChannelPage(BaseModel):
+    items: List[ChannelRead]
+    next_cursor: Optional[str]
+    approx_total: Optional[int]
+
+
 class DiscoveryStateRead(BaseModel):
     id: int
     keyword: str
@@ -59,6 +72,13 @@ class DiscoveryProgress(BaseModel):
     current_keyword: Optional[str]
     last_run_at: Optional[datetime]
     new_channels: int = 0
+    skipped: int = 0
+    cycles: int = 0
+    enriched: int = 0
+    enrich_errors: int = 0
+    queue_depth: int = 0
+    new_per_min: float = 0.0
+    enriched_per_min: float = 0.0
 
 
 class EnrichSettings(BaseModel):
@@ -76,13 +96,54 @@ class EnrichmentRequest(BaseModel):
     settings: EnrichSettings
 
 
+class KeywordYield(BaseModel):
+    keyword: str
+    runs_count: int
+    new_channels_found: int
+    yield_per_run: float
+    exhausted: bool
+    last_run_at: Optional[datetime]
+    recent_yield: float = 0.0
+    cooldown_until: Optional[datetime] = None
+
+
+class EnrichJobRead(BaseModel):
+    id: int
+    status: str
+    scope: Optional[str]
+    total: int
+    completed: int
+    failed: int
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        orm_mode = True
+
+
+class EnrichJobProgress(BaseModel):
+    job_id: int
+    status: str
+    total: int
+    pending: int = 0
+    claimed: int = 0
+    done: int = 0
+    error: int = 0
+    cancelled: int = 0
+    percent: float = 0.0
+
+
 class StatsResponse(BaseModel):
     total: int
+    new: int = 0
     active: int
     blacklisted: int
     archived: int
     running_keyword: Optional[str]
     last_run_at: Optional[datetime]
+    keywords: List[KeywordYield] = []
 
 
 class ChannelsQuery(BaseModel):
@@ -0,0 +1,139 @@
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import parse_qs, urlparse
+
+from backend.scraper.renderers import text_of
+
+# One pass over the text finds every kind of contact. Each alternative can only
+# start at a token boundary (the lookbehinds), so a failed attempt never rescans
+# the middle of a word and the scan stays linear in the input. Obfuscated
+# addresses need a bracketed [at]: a bare "x at y dot z" is too common in prose.
+_AT = r"(?:\s*[\[({]\s*at\s*[\])}]\s*)"
+_DOT = r"(?:\s*[\[({]\s*dot\s*[\])}]\s*)"
+CONTACT_REGEX = re.compile(
+    r"(?<![\w.%+-])(?P<email>[\w.%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,})"
+    r"|(?<![\w.%+-])(?P<ouser>[\w.%+-]+)" + _AT + r"(?P<odomain>[A-Za-z0-9-]+)(?:" + _DOT + r"|\.)"
+    r"(?P<otld>[A-Za-z]{2,})\b"
+    r"|(?<![\w/.])(?:https?://)?(?:www\.)?(?:t|telegram)\.me/(?P<tme>[A-Za-z0-9_]{4,})"
+    r"|(?<![\w@/])@(?P<handle>[A-Za-z0-9_]{4,})",
+    re.IGNORECASE,
+)
+
+# "name@2x.png" style asset names look like addresses.
+_FILE_SUFFIXES = {"png", "jpg", "jpeg", "gif", "webp", "svg", "js", "css"}
+
+
+class Contacts(NamedTuple):
+    emails: List[str]
+    telegram_links: List[str]
+    handles: List[str]
+
+    @property
+    def telegram(self) -> Optional[str]:
+        if self.telegram_links:
+            return self.telegram_links[0]
+        return self.handles[0] if self.handles else None
+
+
+def _add(bucket: List[str], seen: set, value: str):
+    key = value.lower()
+    if key not in seen:
+        seen.add(key)
+        bucket.append(value)
+
+
+def scan_text(*texts: Optional[str]) -> Contacts:
+    emails: List[str] = []
+    links: List[str] = []
+    handles: List[str] = []
+    seen_emails, seen_links, seen_handles = set(), set(), set()
+    for text in texts:
+        if not text:
+            continue
+        for match in CONTACT_REGEX.finditer(text):
+            if match.group("email"):
+                email = match.group("email").rstrip(".").lower()
+                if email.rsplit(".", 1)[-1] not in _FILE_SUFFIXES:
+                    _add(emails, seen_emails, email)
+            elif match.group("ouser"):
+                email = f"{match.group('ouser')}@{match.group('odomain')}.{match.group('otld')}"
+                _add(emails, seen_emails, email.lower())
+            elif match.group("tme"):
+                _add(links, seen_links, f"@{match.group('tme')}")
+            elif match.group("handle"):
+                _add(handles, seen_handles, f"@{match.group('handle')}")
+    return Contacts(sorted(emails), links, handles)
+
+
+def unwrap_redirect(url: Optional[str]) -> Optional[str]:
+    # youtube.com/redirect?...&q=<target> links hide the real destination.
+    if not url or "/redirect" not in url:
+        return url
+    target = parse_qs(urlparse(url).query).get("q")
+    return target[0] if target else url
+
+
+def _walk_for(node: Any, key: str, limit: int = 2_000) -> Iterable[dict]:
+    stack = [node]
+    visited = 0
+    while stack and visited < limit:
+        current = stack.pop()
+        visited += 1
+        if isinstance(current, dict):
+            if key in current:
+                yield current[key]
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+
+
+def _link_from_view_model(model: dict) -> Optional[str]:
+    link = model.get("link") or {}
+    for run in link.get("commandRuns") or []:
+        url = run.get("onTap", {}).get("innertubeCommand", {}).get("urlEndpoint", {}).get("url")
+        if url:
+            return unwrap_redirect(url)
+    return link.get("content")
+
+
+def about_fields(data: Optional[dict]) -> Dict:
+    # Pulls title, description and external links from the about page's
+    # ytInitialData, covering the classic about tab, the c4 header links and the
+    # newer aboutChannelViewModel engagement panel.
+    if not data:
+        return {}
+    metadata = (data.get("metadata") or {}).get("channelMetadataRenderer") or {}
+    title = metadata.get("title")
+    description = metadata.get("description") or ""
+    links: List[str] = []
+
+    header = data.get("header") or {}
+    header_links = (header.get("c4TabbedHeaderRenderer") or {}).get("headerLinks") or {}
+    for group in ("primaryLinks", "secondaryLinks"):
+        for link in (header_links.get("channelHeaderLinksRenderer") or {}).get(group) or []:
+            links.append(unwrap_redirect(link.get("navigationEndpoint", {}).get("urlEndpoint", {}).get("url")))
+
+    for about in _walk_for(data.get("contents") or {}, "channelAboutFullMetadataRenderer"):
+        description = description or text_of(about.get("description")) or ""
+        for link in about.get("primaryLinks") or []:
+            links.append(unwrap_redirect(link.get("navigationEndpoint", {}).get("urlEndpoint", {}).get("url")))
+
+    for endpoints_key in ("onResponseReceivedEndpoints", "onResponseReceivedActions"):
+        for about in _walk_for(data.get(endpoints_key) or [], "aboutChannelViewModel"):
+            description = description or about.get("description") or ""
+            for link in about.get("links") or []:
+                model = link.get("channelExternalLinkViewModel") or {}
+                links.append(_link_from_view_model(model))
+
+    for model in _walk_for(header.get("pageHeaderRenderer") or {}, "channelExternalLinkViewModel"):
+        links.append(_link_from_view_model(model))
+
+    return {
+        "title": title,
+        "description": description,
+        "links": list(dict.fromkeys(link for link in links if link)),
+    }
+
+
+def extract_contacts(fields: Dict) -> Contacts:
+    return scan_text(fields.get("description"), " ".join(fields.get("links") or []))
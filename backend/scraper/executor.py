@@ -0,0 +1,67 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from backend import metrics
+from backend.config import get_settings
+from backend.logging_config import logger
+from backend.scraper.language_detect import preload as preload_language_profiles
+
+settings = get_settings()
+
+_executor: Optional[Executor] = None
+
+
+def start_executor(kind: Optional[str] = None, workers: Optional[int] = None) -> Optional[Executor]:
+    # "process" (default) parses on other cores, "thread" only keeps the loop
+    # responsive, "inline" runs on the loop as before (useful when debugging).
+    global _executor
+    if _executor is not None:
+        return _executor
+    kind = kind or settings.parse_executor
+    workers = workers or settings.parse_workers
+    if kind == "process":
+        # spawn rather than fork: the parent has an event loop and DB threads running.
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=preload_language_profiles,
+        )
+    elif kind == "thread":
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="parse")
+    elif kind != "inline":
+        raise ValueError(f"unknown parse_executor {kind!r}")
+    logger.info("parse executor: %s (%s workers)", kind, workers or "default")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _call_captured(fn: Callable[..., Any], args: tuple, kwargs: dict):
+    # Runs in a worker process; timers recorded there travel back with the result.
+    with metrics.capture() as observations:
+        result = fn(*args, **kwargs)
+    return result, observations
+
+
+async def run_cpu(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # `fn` must be a module-level function and its arguments picklable so it can be
+    # shipped to a worker process; pass raw bytes in and get compact results back.
+    if _executor is None and settings.parse_executor != "inline":
+        start_executor()
+    with metrics.CPU_TASK_SECONDS.time(task=fn.__name__):
+        if _executor is None:
+            return fn(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        if isinstance(_executor, ProcessPoolExecutor):
+            result, observations = await loop.run_in_executor(_executor, _call_captured, fn, args, kwargs)
+            metrics.replay(observations)
+            return result
+        return await loop.run_in_executor(_executor, partial(fn, *args, **kwargs))
@@ -0,0 +1,47 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class FetchCache:
+    # Memoizes scraper results for the lifetime of one scope. Concurrent callers of
+    # the same key share a single in-flight load.
+    def __init__(self):
+        self._entries: Dict[Hashable, asyncio.Future] = {}
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._entries.get(key)
+        if future is None:
+            future = asyncio.ensure_future(loader())
+            future.add_done_callback(lambda done: self._evict_failed(key, done))
+            self._entries[key] = future
+        # Shielded so one cancelled caller does not cancel the load for everyone else.
+        return await asyncio.shield(future)
+
+    def _evict_failed(self, key: Hashable, future: asyncio.Future):
+        if future.cancelled() or future.exception() is not None:
+            if self._entries.get(key) is future:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_current: ContextVar[Optional[FetchCache]] = ContextVar("fetch_cache", default=None)
+
+
+@contextmanager
+def fetch_scope():
+    token = _current.set(FetchCache())
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+async def memoized(key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+    cache = _current.get()
+    if cache is None:
+        return await loader()
+    return await cache.get_or_load(key, loader)
@@ -0,0 +1,209 @@
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+
+from backend import metrics
+from backend.config import get_settings
+from backend.logging_config import logger
+from backend.scraper import response_cache
+from backend.scraper.rate_limit import get_limiter, parse_retry_after
+from backend.scraper.replay import ReplayTransport, request_key
+from backend.scraper.response_cache import get_response_cache, url_class
+
+settings = get_settings()
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+# Caps in-flight requests per host; a slot is held until the response body is closed,
+# or released straight away when the transport hands back an already-read response.
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, per_host_limit: int):
+        self._transport = transport
+        self._per_host_limit = per_host_limit
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _slot(self, host: str) -> asyncio.Semaphore:
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = asyncio.Semaphore(self._per_host_limit)
+        return slot
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slot = self._slot(request.url.host)
+        await slot.acquire()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                slot.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        if response.is_closed:
+            # Built from in-memory content (replays, recordings, mock transports):
+            # httpx never closes the stream again, so there is nothing to hold the slot for.
+            release()
+            return response
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    if settings.http_cache_offline and not settings.http_cache_path:
+        raise ValueError("http_cache_offline needs http_cache_path: there is no cache to serve from")
+    http2 = settings.http_http2
+    if http2 and not _http2_available():
+        logger.warning("http2 requested but the h2 package is not installed; falling back to HTTP/1.1")
+        http2 = False
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    if transport is None and settings.http_replay_dir:
+        logger.info("serving scraper requests from recordings in %s", settings.http_replay_dir)
+        transport = ReplayTransport(settings.http_replay_dir)
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+    return httpx.AsyncClient(
+        headers={"User-Agent": settings.user_agent},
+        cookies=httpx.Cookies(),
+        timeout=httpx.Timeout(settings.http_timeout),
+        follow_redirects=True,
+        transport=HostLimitedTransport(transport, settings.http_per_host_limit),
+    )
+
+
+async def open_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_client(transport)
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    # Scripts and background tasks running outside the app lifespan get a lazily created client.
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_client()
+    return _client
+
+
+def set_client(client: Optional[httpx.AsyncClient]):
+    global _client
+    _client = client
+
+
+async def fetch(
+    method: str, url: str, client: Optional[httpx.AsyncClient] = None, attempts: Optional[int] = None, **kwargs
+) -> httpx.Response:
+    # Single entry point for scraper traffic. Known page classes are served from the
+    # on-disk response cache while fresh and revalidated with ETag/Last-Modified once
+    # stale. Everything that does go out waits for the host's rate limiter, feeds the
+    # outcome back into it and retries 429/5xx/transport errors. Returns the last
+    # response (the caller decides about its status) or raises the last transport error.
+    # In offline mode a cache miss is answered with a synthetic 504.
+    client = client or get_client()
+    request = client.build_request(method, url, **kwargs)
+    cache = get_response_cache()
+    page_class = url_class(request.url)
+    kind = page_class if cache else None
+    label = page_class or "other"
+    key = request_key(request)
+    cached = await response_cache.lookup(cache, key) if kind else None
+    if settings.http_cache_offline:
+        # Nothing goes out offline: anything not in the cache, including URLs
+        # the cache never stores, is a miss.
+        if cached is None:
+            metrics.CACHE.inc(url_class=label, result="offline_miss")
+            logger.warning("offline: no cached response for %s", key)
+            return httpx.Response(504, request=request)
+        cache.hits += 1
+        metrics.CACHE.inc(url_class=label, result="hit")
+        return cached.to_response(request)
+    if cached is not None:
+        if cached.fresh:
+            cache.hits += 1
+            metrics.CACHE.inc(url_class=label, result="hit")
+            return cached.to_response(request)
+        request.headers.update(cached.validators())
+    elif kind:
+        metrics.CACHE.inc(url_class=label, result="miss")
+
+    limiter = get_limiter(request.url.host)
+    last_response: Optional[httpx.Response] = None
+    last_error: Optional[Exception] = None
+    for attempt in range(attempts or settings.http_retries):
+        if attempt:
+            metrics.RETRIES.inc(url_class=label)
+        await limiter.acquire()
+        try:
+            with metrics.FETCH_SECONDS.time(url_class=label):
+                response = await client.send(request)
+        except httpx.TransportError as exc:
+            limiter.on_error()
+            last_error = exc
+            logger.warning("%s %s failed: %s", method, url, exc)
+            continue
+        status = str(response.status_code)
+        metrics.RESPONSES.inc(url_class=label, status=status)
+        metrics.RESPONSE_BYTES.observe(len(response.content), url_class=label)
+        if response.status_code == 429 or response.status_code >= 500:
+            metrics.THROTTLED.inc(url_class=label, status=status)
+            limiter.on_throttle(parse_retry_after(response.headers.get("retry-after")))
+            last_response = response
+            continue
+        limiter.on_success()
+        if cached is not None and response.status_code == 304:
+            metrics.CACHE.inc(url_class=label, result="revalidated")
+            await asyncio.to_thread(cache.refresh, key, kind, response)
+            return cached.to_response(request)
+        if cached is not None:
+            metrics.CACHE.inc(url_class=label, result="stale")
+        if kind and response.status_code == 200:
+            await response_cache.store(cache, key, kind, response)
+        return response
+    if last_response is not None:
+        return last_response
+    raise last_error
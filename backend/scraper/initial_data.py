@@ -0,0 +1,79 @@
+import json
+import re
+from typing import Optional, Union
+
+from bs4 import BeautifulSoup
+
+from backend import metrics
+
+INITIAL_DATA = "ytInitialData"
+PLAYER_RESPONSE = "ytInitialPlayerResponse"
+
+_decoder = json.JSONDecoder()
+_marker_patterns = {}
+
+
+def _marker_pattern(name: str) -> re.Pattern:
+    pattern = _marker_patterns.get(name)
+    if pattern is None:
+        # Matches `var NAME =`, `window["NAME"] =` and `window.NAME =` assignments.
+        pattern = re.compile(
+            r"(?:var\s+|window\[\s*[\"']|window\.)" + re.escape(name) + r"(?:[\"']\s*\])?\s*=\s*"
+        )
+        _marker_patterns[name] = pattern
+    return pattern
+
+
+def _as_text(page: Union[str, bytes]) -> str:
+    if isinstance(page, bytes):
+        return page.decode("utf-8", errors="replace")
+    return page or ""
+
+
+def extract_json_fast(page: Union[str, bytes], name: str) -> Optional[dict]:
+    # Locates the assignment directly in the page and decodes only the JSON object
+    # that follows it, without building a DOM or copying the surrounding script.
+    text = _as_text(page)
+    for match in _marker_pattern(name).finditer(text):
+        start = match.end()
+        if text[start:start + 1] != "{":
+            continue
+        try:
+            data, _ = _decoder.raw_decode(text, start)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def extract_json_soup(page: Union[str, bytes], name: str) -> Optional[dict]:
+    soup = BeautifulSoup(_as_text(page), "html.parser")
+    marker = f"var {name} ="
+    for script in soup.find_all("script"):
+        if script.string and name in script.string:
+            text = script.string
+            if marker in text:
+                blob = text.split(marker, 1)[1].split(";\n", 1)[0]
+                try:
+                    return json.loads(blob)
+                except Exception:
+                    continue
+    return None
+
+
+def extract_json(page: Union[str, bytes], name: str) -> Optional[dict]:
+    with metrics.PARSE_SECONDS.time(stage="json"):
+        data = extract_json_fast(page, name)
+    if data is None:
+        with metrics.PARSE_SECONDS.time(stage="soup"):
+            data = extract_json_soup(page, name)
+    return data
+
+
+def extract_initial_data(page: Union[str, bytes]) -> Optional[dict]:
+    return extract_json(page, INITIAL_DATA)
+
+
+def extract_player_response(page: Union[str, bytes]) -> Optional[dict]:
+    return extract_json(page, PLAYER_RESPONSE)
@@ -1,20 +1,152 @@
-from typing import List
-from langdetect import detect
+import hashlib
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict
+from typing import List, Optional, Sequence, Tuple
 
+from langdetect import DetectorFactory, detect_langs
+from langdetect.detector_factory import init_factory
+from langdetect.lang_detect_exception import LangDetectException
+
+from backend import metrics
 
 LANG_FALLBACK = "EN"
+CACHE_SIZE = 50_000
+# Share of letters a script needs before the text is attributed to it without
+# running the statistical detector.
+SCRIPT_THRESHOLD = 0.6
+
+# langdetect is probabilistic; a fixed seed makes repeated calls agree.
+DetectorFactory.seed = 0
+
+_cache: "OrderedDict[bytes, Tuple[Tuple[str, float], ...]]" = OrderedDict()
+_preloaded = False
+
+_SCRIPT_LANGUAGES = {
+    "HANGUL": "KO",
+    "HIRAGANA": "JA",
+    "KATAKANA": "JA",
+    "CJK": "ZH",
+    "THAI": "TH",
+    "HEBREW": "HE",
+    "GREEK": "EL",
+    "DEVANAGARI": "HI",
+    "GEORGIAN": "KA",
+    "ARMENIAN": "HY",
+}
+_UKRAINIAN_ONLY = set("іїєґІЇЄҐ")
+_RUSSIAN_ONLY = set("ыэъЫЭЪ")
+
+
+def preload():
+    # Loads the language profiles once (they are otherwise read on first use).
+    global _preloaded
+    if not _preloaded:
+        init_factory()
+        _preloaded = True
+
+
+def _script_of(char: str) -> Optional[str]:
+    try:
+        name = unicodedata.name(char)
+    except ValueError:
+        return None
+    return name.split(" ", 1)[0]
+
+
+def detect_by_script(text: str) -> Optional[str]:
+    scripts = Counter()
+    cyrillic = []
+    for char in text:
+        if not char.isalpha():
+            continue
+        script = _script_of(char)
+        scripts[script] += 1
+        if script == "CYRILLIC":
+            cyrillic.append(char)
+    letters = sum(scripts.values())
+    if not letters:
+        return None
+    # Kana anywhere means Japanese even though most characters may be Han.
+    if scripts["HIRAGANA"] + scripts["KATAKANA"] and (
+        scripts["HIRAGANA"] + scripts["KATAKANA"] + scripts["CJK"]
+    ) / letters >= SCRIPT_THRESHOLD:
+        return "JA"
+    script, count = scripts.most_common(1)[0]
+    if count / letters < SCRIPT_THRESHOLD:
+        return None
+    if script == "CYRILLIC":
+        chars = set(cyrillic)
+        if chars & _UKRAINIAN_ONLY:
+            return "UK"
+        if chars & _RUSSIAN_ONLY:
+            return "RU"
+        return None
+    return _SCRIPT_LANGUAGES.get(script)
+
+
+def _key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def probabilities(text: str) -> Tuple[Tuple[str, float], ...]:
+    text = (text or "").strip()
+    if not text:
+        return ()
+    key = _key(text)
+    cached = _cache.get(key)
+    if cached is not None:
+        _cache.move_to_end(key)
+        return cached
+    by_script = detect_by_script(text)
+    if by_script:
+        result: Tuple[Tuple[str, float], ...] = ((by_script, 1.0),)
+    else:
+        preload()
+        try:
+            result = tuple((lang.lang[:2].upper(), lang.prob) for lang in detect_langs(text))
+        except LangDetectException:
+            result = ()
+    _cache[key] = result
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return result
 
 
 def detect_language_basic(texts: List[str]) -> str:
+    with metrics.LANGUAGE_SECONDS.time(mode="basic"):
+        return _detect_basic(texts)
+
+
+def _detect_basic(texts: List[str]) -> str:
     combined = "\n".join(filter(None, texts))
     if not combined.strip():
         return LANG_FALLBACK
-    try:
-        return detect(combined)[:2].upper()
-    except Exception:
-        return LANG_FALLBACK
+    probs = probabilities(combined)
+    return probs[0][0] if probs else LANG_FALLBACK
 
 
 def detect_language_precise(texts: List[str]) -> str:
-    # For demo purposes use same detector; placeholder for improved logic
-    return detect_language_basic(texts)
+    with metrics.LANGUAGE_SECONDS.time(mode="precise"):
+        return _detect_precise(texts)
+
+
+def _detect_precise(texts: List[str]) -> str:
+    # texts[0] is the channel name, the rest video titles. Each text votes for its
+    # candidate languages with probability x length, so long, confidently detected
+    # titles outweigh short or ambiguous ones; the name counts half.
+    scores = defaultdict(float)
+    for index, text in enumerate(texts):
+        if not text or not text.strip():
+            continue
+        weight = min(len(text), 200) * (0.5 if index == 0 else 1.0)
+        for lang, prob in probabilities(text):
+            scores[lang] += prob * weight
+    if not scores:
+        return LANG_FALLBACK
+    return max(scores.items(), key=lambda item: item[1])[0]
+
+
+def detect_languages_batch(batches: Sequence[List[str]], precise: bool = True) -> List[str]:
+    # One call (and one executor round trip) for many channels' texts.
+    detect = detect_language_precise if precise else detect_language_basic
+    return [detect(texts) for texts in batches]
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either delay-seconds or an HTTP date.
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostLimiter:
+    # Token bucket whose refill rate adapts AIMD-style: every success adds a little
+    # to the rate, every 429/5xx halves it (and honours Retry-After by pausing the
+    # whole host), so concurrent callers share one view of how hard to push.
+    def __init__(
+        self,
+        host: str,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        increase: float,
+        decrease: float,
+        burst: float,
+    ):
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.successes = 0
+        self.throttled = 0
+        self.errors = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # Waiters queue on the lock, so they are released in arrival order.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self.paused_until > now:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_success(self):
+        self.successes += 1
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.tokens = 0
+        if retry_after:
+            self.paused_until = max(self.paused_until, time.monotonic() + min(retry_after, settings.rate_max_pause))
+
+    def on_error(self):
+        self.errors += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+
+    def snapshot(self) -> Dict:
+        paused_for = max(0.0, self.paused_until - time.monotonic())
+        return {
+            "host": self.host,
+            "rate": round(self.rate, 3),
+            "tokens": round(self.tokens, 2),
+            "paused_for": round(paused_for, 1),
+            "successes": self.successes,
+            "throttled": self.throttled,
+            "errors": self.errors,
+        }
+
+
+_limiters: Dict[str, HostLimiter] = {}
+
+
+def get_limiter(host: str) -> HostLimiter:
+    limiter = _limiters.get(host)
+    if limiter is None:
+        limiter = _limiters[host] = HostLimiter(
+            host,
+            rate=settings.rate_initial,
+            min_rate=settings.rate_min,
+            max_rate=settings.rate_max,
+            increase=settings.rate_increase,
+            decrease=settings.rate_decrease,
+            burst=settings.rate_burst,
+        )
+    return limiter
+
+
+def snapshot_all():
+    return [limiter.snapshot() for limiter in _limiters.values()]
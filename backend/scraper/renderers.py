@@ -0,0 +1,251 @@
+import re
+from datetime import datetime, timedelta
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple
+
+from backend import metrics
+
+# Upper bound for the generic walk used when a page layout is not recognised.
+FALLBACK_WALK_LIMIT = 50_000
+
+
+class ChannelRecord(NamedTuple):
+    channel_id: str
+    name: Optional[str]
+    url: Optional[str]
+    subscriber_count_text: Optional[str] = None
+
+
+class VideoRecord(NamedTuple):
+    video_id: str
+    title: Optional[str]
+    published_time_text: Optional[str] = None
+    duration_text: Optional[str] = None
+    view_count_text: Optional[str] = None
+    is_short: bool = False
+    channel_id: Optional[str] = None
+    channel_name: Optional[str] = None
+
+
+class PageItems(NamedTuple):
+    channels: List[ChannelRecord]
+    videos: List[VideoRecord]
+    continuation: Optional[str]
+
+
+def text_of(node: Any) -> Optional[str]:
+    if not isinstance(node, dict):
+        return None
+    if "simpleText" in node:
+        return node["simpleText"]
+    runs = node.get("runs")
+    if runs:
+        return "".join(run.get("text", "") for run in runs)
+    return None
+
+
+def channel_url(channel_id: str) -> str:
+    return f"https://www.youtube.com/channel/{channel_id}"
+
+
+_COUNT_RE = re.compile(r"([\d.,]+)\s*([KMB])?", re.IGNORECASE)
+_MULTIPLIERS = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+
+def parse_count(text: Optional[str]) -> Optional[int]:
+    # "1.23M subscribers" -> 1230000, "8,412 subscribers" -> 8412
+    if not text:
+        return None
+    match = _COUNT_RE.search(text)
+    if not match:
+        return None
+    number, suffix = match.groups()
+    try:
+        if suffix:
+            return int(float(number.replace(",", ".")) * _MULTIPLIERS[suffix.upper()])
+        return int(number.replace(",", "").replace(".", ""))
+    except ValueError:
+        return None
+
+
+_AGO_RE = re.compile(r"(\d+)\s+(second|minute|hour|day|week|month|year)s?\s+ago", re.IGNORECASE)
+_UNIT_DAYS = {"second": 1 / 86400, "minute": 1 / 1440, "hour": 1 / 24, "day": 1, "week": 7, "month": 30, "year": 365}
+
+
+def parse_published(text: Optional[str], now: Optional[datetime] = None) -> Optional[datetime]:
+    # "3 days ago", "Streamed 2 weeks ago" -> approximate datetime
+    if not text:
+        return None
+    match = _AGO_RE.search(text)
+    if not match:
+        return None
+    amount, unit = match.groups()
+    now = now or datetime.utcnow()
+    return now - timedelta(days=int(amount) * _UNIT_DAYS[unit.lower()])
+
+
+def _channel_from_renderer(renderer: dict) -> Optional[ChannelRecord]:
+    channel_id = renderer.get("channelId")
+    if not channel_id:
+        return None
+    # Newer layouts put the @handle in subscriberCountText and the count in videoCountText.
+    subscribers = None
+    for key in ("subscriberCountText", "videoCountText"):
+        candidate = text_of(renderer.get(key))
+        if candidate and "subscriber" in candidate.lower():
+            subscribers = candidate
+            break
+    return ChannelRecord(channel_id, text_of(renderer.get("title")), channel_url(channel_id), subscribers)
+
+
+def _owner_of(renderer: dict) -> Tuple[Optional[str], Optional[str]]:
+    for key in ("ownerText", "longBylineText", "shortBylineText"):
+        runs = (renderer.get(key) or {}).get("runs") or []
+        for run in runs:
+            browse = run.get("navigationEndpoint", {}).get("browseEndpoint", {})
+            if browse.get("browseId", "").startswith("UC"):
+                return browse["browseId"], run.get("text")
+    return None, None
+
+
+def _video_from_renderer(renderer: dict, is_short: bool = False) -> Optional[VideoRecord]:
+    video_id = renderer.get("videoId")
+    if not video_id:
+        return None
+    channel_id, channel_name = _owner_of(renderer)
+    duration = text_of(renderer.get("lengthText"))
+    if duration is None:
+        for overlay in renderer.get("thumbnailOverlays") or []:
+            status = overlay.get("thumbnailOverlayTimeStatusRenderer")
+            if status:
+                duration = text_of(status.get("text"))
+                is_short = is_short or status.get("style") == "SHORTS"
+                break
+    return VideoRecord(
+        video_id=video_id,
+        title=text_of(renderer.get("title")) or text_of(renderer.get("headline")),
+        published_time_text=text_of(renderer.get("publishedTimeText")),
+        duration_text=duration,
+        view_count_text=text_of(renderer.get("viewCountText")),
+        is_short=is_short,
+        channel_id=channel_id,
+        channel_name=channel_name,
+    )
+
+
+class _Collector:
+    def __init__(self):
+        self.channels: List[ChannelRecord] = []
+        self.videos: List[VideoRecord] = []
+        self.continuation: Optional[str] = None
+        self._seen_channels = set()
+        self._seen_videos = set()
+
+    def add_channel(self, record: Optional[ChannelRecord]):
+        # Only channelRenderer results count as channels. The owners of video
+        # results stay on their VideoRecord and are not discovered from here.
+        if not record or record.channel_id in self._seen_channels:
+            return
+        self._seen_channels.add(record.channel_id)
+        self.channels.append(record)
+
+    def add_video(self, record: Optional[VideoRecord]):
+        if not record or record.video_id in self._seen_videos:
+            return
+        self._seen_videos.add(record.video_id)
+        self.videos.append(record)
+
+    def items(self, items: Iterable[Any]):
+        for item in items or []:
+            if isinstance(item, dict):
+                self.item(item)
+
+    def item(self, item: dict):
+        # Only descends into containers known to hold result renderers.
+        if "channelRenderer" in item:
+            self.add_channel(_channel_from_renderer(item["channelRenderer"]))
+        elif "videoRenderer" in item:
+            self.add_video(_video_from_renderer(item["videoRenderer"]))
+        elif "gridVideoRenderer" in item:
+            self.add_video(_video_from_renderer(item["gridVideoRenderer"]))
+        elif "reelItemRenderer" in item:
+            self.add_video(_video_from_renderer(item["reelItemRenderer"], is_short=True))
+        elif "richItemRenderer" in item:
+            self.item(item["richItemRenderer"].get("content") or {})
+        elif "itemSectionRenderer" in item:
+            self.items(item["itemSectionRenderer"].get("contents"))
+        elif "shelfRenderer" in item:
+            content = item["shelfRenderer"].get("content") or {}
+            for key in ("verticalListRenderer", "horizontalListRenderer", "expandedShelfContentsRenderer"):
+                if key in content:
+                    self.items(content[key].get("items"))
+        elif "reelShelfRenderer" in item:
+            self.items(item["reelShelfRenderer"].get("items"))
+        elif "richSectionRenderer" in item:
+            shelf = (item["richSectionRenderer"].get("content") or {}).get("richShelfRenderer") or {}
+            self.items(shelf.get("contents"))
+        elif "gridRenderer" in item:
+            self.items(item["gridRenderer"].get("items"))
+        elif "continuationItemRenderer" in item:
+            endpoint = item["continuationItemRenderer"].get("continuationEndpoint") or {}
+            token = endpoint.get("continuationCommand", {}).get("token")
+            if token and not self.continuation:
+                self.continuation = token
+
+    def result(self) -> PageItems:
+        return PageItems(self.channels, self.videos, self.continuation)
+
+
+def _known_sections(data: dict) -> Optional[List[Any]]:
+    contents = data.get("contents") or {}
+    search = contents.get("twoColumnSearchResultsRenderer")
+    if search:
+        return search.get("primaryContents", {}).get("sectionListRenderer", {}).get("contents")
+    browse = contents.get("twoColumnBrowseResultsRenderer")
+    if browse:
+        sections = []
+        for tab in browse.get("tabs") or []:
+            content = (tab.get("tabRenderer") or {}).get("content") or {}
+            if "richGridRenderer" in content:
+                sections.extend(content["richGridRenderer"].get("contents") or [])
+            elif "sectionListRenderer" in content:
+                sections.extend(content["sectionListRenderer"].get("contents") or [])
+        return sections
+    # youtubei continuation responses
+    commands = data.get("onResponseReceivedCommands") or data.get("onResponseReceivedActions")
+    if commands:
+        sections = []
+        for command in commands:
+            for key in ("appendContinuationItemsAction", "reloadContinuationItemsCommand"):
+                if key in command:
+                    sections.extend(command[key].get("continuationItems") or [])
+        return sections
+    return None
+
+
+def _bounded_walk(data: Any, collector: _Collector, limit: int = FALLBACK_WALK_LIMIT):
+    stack = [data]
+    visited = 0
+    while stack and visited < limit:
+        current = stack.pop()
+        visited += 1
+        if isinstance(current, dict):
+            if "channelRenderer" in current or "videoRenderer" in current or "gridVideoRenderer" in current:
+                collector.item(current)
+                continue
+            stack.extend(reversed(list(current.values())))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+
+
+def extract_items(data: Optional[dict]) -> PageItems:
+    collector = _Collector()
+    if not data:
+        return collector.result()
+    sections = _known_sections(data)
+    if sections is None:
+        with metrics.PARSE_SECONDS.time(stage="walk"):
+            _bounded_walk(data, collector)
+    else:
+        with metrics.PARSE_SECONDS.time(stage="renderers"):
+            collector.items(sections)
+    return collector.result()
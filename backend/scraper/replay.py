@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional, Union
+
+import httpx
+
+from backend.logging_config import logger
+
+# Recorded responses live one per file as JSON:
+#   {"key": "...", "status": 200, "headers": {...}, "body": "..."}
+# The key is the method and URL; for youtubei POSTs it is the continuation token,
+# because the rest of the request body (client context) changes between versions.
+
+
+def request_key(request: httpx.Request) -> str:
+    if request.method == "POST" and "/youtubei/" in request.url.path:
+        try:
+            payload = json.loads(request.content or b"{}")
+        except ValueError:
+            payload = {}
+        if payload.get("continuation"):
+            return f"POST {request.url.path} continuation={payload['continuation']}"
+    return f"{request.method} {request.url.copy_remove_param('prettyPrint')}"
+
+
+def _recording_path(directory: Path, key: str) -> Path:
+    return directory / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+
+def save_recording(directory: Union[str, Path], key: str, status: int, headers: dict, body: str):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    record = {"key": key, "status": status, "headers": headers, "body": body}
+    _recording_path(directory, key).write_text(json.dumps(record), encoding="utf-8")
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    # Serves recorded responses; unrecorded requests get a 404 so scrapers take their
+    # normal failure path instead of touching the network.
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        path = _recording_path(self.directory, key)
+        if not path.exists():
+            logger.warning("no recording for %s", key)
+            return httpx.Response(404, request=request)
+        record = json.loads(path.read_text(encoding="utf-8"))
+        return httpx.Response(
+            record.get("status", 200),
+            headers=record.get("headers") or {},
+            content=record.get("body", "").encode("utf-8"),
+            request=request,
+        )
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    # Passes requests through and stores every response for later replay.
+    def __init__(self, directory: Union[str, Path], transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.directory = Path(directory)
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        body = await response.aread()
+        # aread() has already decoded the body, so the encoding headers no longer apply.
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        }
+        save_recording(
+            self.directory,
+            request_key(request),
+            response.status_code,
+            {"content-type": response.headers.get("content-type", "")},
+            body.decode("utf-8", "replace"),
+        )
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+async def _walk_pages(keyword: str, pages: int, transport: httpx.AsyncBaseTransport):
+    from backend.scraper.http_client import build_client
+    from backend.scraper.youtube_search import search_channels
+
+    client = build_client(transport)
+    try:
+        token = None
+        for page in range(1, pages + 1):
+            channels, token = await search_channels(keyword, continuation=token, client=client)
+            print(f"page {page}: {len(channels)} channels, continuation={'yes' if token else 'no'}")
+            if not token:
+                break
+    finally:
+        await client.aclose()
+
+
+def main():
+    # python -m backend.scraper.replay record recordings/ "bitcoin" --pages 5
+    # python -m backend.scraper.replay replay recordings/ "bitcoin" --pages 5
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("directory")
+    parser.add_argument("keyword")
+    parser.add_argument("--pages", type=int, default=3)
+    args = parser.parse_args()
+    if args.mode == "record":
+        transport = RecordingTransport(args.directory)
+    else:
+        transport = ReplayTransport(args.directory)
+    asyncio.run(_walk_pages(args.keyword, args.pages, transport))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, NamedTuple, Optional
+
+import httpx
+
+from backend.config import get_settings
+from backend.logging_config import logger
+
+settings = get_settings()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url_class TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at);
+"""
+
+# Only the headers scrapers look at are kept; the body is stored already decoded.
+_KEPT_HEADERS = ("content-type",)
+
+
+def url_class(url: httpx.URL) -> Optional[str]:
+    path = url.path.rstrip("/")
+    if path == "/results" or path == "/youtubei/v1/search":
+        return "search"
+    if path.endswith("/about"):
+        return "about"
+    if path.endswith("/videos"):
+        return "videos"
+    if path == "/watch":
+        return "watch"
+    return None
+
+
+def ttl_for(kind: str) -> float:
+    return {
+        "search": settings.http_cache_ttl_search,
+        "about": settings.http_cache_ttl_about,
+        "videos": settings.http_cache_ttl_videos,
+        "watch": settings.http_cache_ttl_watch,
+    }[kind]
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(self.status, headers=self.headers, content=self.body, request=request)
+
+
+class ResponseCache:
+    # Persistent scraper response cache in its own SQLite file, separate from the
+    # application database so cache churn never contends with its write lock.
+    # Bodies are zlib-compressed; once the total exceeds max_bytes the least
+    # recently read entries are evicted. All methods are blocking and are meant
+    # to be called through asyncio.to_thread.
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        status, headers, body, etag, last_modified, expires_at = row
+        return CachedResponse(status, json.loads(headers), zlib.decompress(body), etag, last_modified, expires_at)
+
+    def put(self, key: str, kind: str, response: httpx.Response):
+        now = time.time()
+        headers = {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers}
+        body = zlib.compress(response.content, 6)
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url_class, status, headers, body, size, etag, last_modified, stored_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    kind,
+                    response.status_code,
+                    json.dumps(headers),
+                    body,
+                    len(body),
+                    response.headers.get("etag"),
+                    response.headers.get("last-modified"),
+                    now,
+                    now + ttl_for(kind),
+                    now,
+                ),
+            )
+            self._total += len(body) - (previous[0] if previous else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def refresh(self, key: str, kind: str, response: httpx.Response):
+        # A 304 confirms the stored body; only the expiry (and any new validators) move.
+        now = time.time()
+        with self._lock:
+            self.revalidated += 1
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (now + ttl_for(kind), now, response.headers.get("etag"), response.headers.get("last-modified"), key),
+            )
+
+    def _evict(self):
+        # Trim to 90% so a full cache is not evicting on every insert.
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((key,))
+            self._total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        logger.info("evicted %s cached responses", len(doomed))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            by_class = dict(self._conn.execute("SELECT url_class, COUNT(*) FROM responses GROUP BY url_class"))
+        return {
+            "path": self.path,
+            "bytes": self._total,
+            "max_bytes": self.max_bytes,
+            "entries": by_class,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "offline": settings.http_cache_offline,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    global _cache
+    if _cache is None and settings.http_cache_path:
+        _cache = ResponseCache(settings.http_cache_path, settings.http_cache_max_bytes)
+    return _cache
+
+
+def close_response_cache():
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+async def lookup(cache: ResponseCache, key: str) -> Optional[CachedResponse]:
+    return await asyncio.to_thread(cache.get, key)
+
+
+async def store(cache: ResponseCache, key: str, kind: str, response: httpx.Response):
+    try:
+        await asyncio.to_thread(cache.put, key, kind, response)
+    except sqlite3.Error as exc:
+        logger.warning("could not cache %s: %s", key, exc)
@@ -1,5 +1,3 @@
-import asyncio
-import random
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -8,83 +6,75 @@ from bs4 import BeautifulSoup
 
 from backend.config import get_settings
 from backend.logging_config import logger
-from backend.scraper.email_extract import extract_emails_from_text
-from backend.scraper.telegram_extract import extract_telegram
+from backend.scraper.contacts import about_fields, extract_contacts
+from backend.scraper.executor import run_cpu
+from backend.scraper.fetch_cache import memoized
+from backend.scraper.http_client import fetch, get_client
+from backend.scraper.initial_data import extract_initial_data
+from backend.scraper.renderers import extract_items, parse_published
 
 settings = get_settings()
 
 
-async def fetch_about(channel_id: str) -> Dict:
+def _about_fields_from_soup(text: str) -> Dict:
+    # Fallback for pages without ytInitialData: meta description and anchors only.
+    soup = BeautifulSoup(text, "html.parser")
+    # str() detaches the title from the soup so the result stays small to pickle.
+    title = str(soup.title.string) if soup.title and soup.title.string else None
+    description = " ".join(
+        [meta.get("content") for meta in soup.find_all("meta", {"name": "description"})]
+    )
+    links = [a.get("href") for a in soup.find_all("a", href=True)]
+    return {"title": title, "description": description, "links": links}
+
+
+def parse_about_page(raw: bytes) -> Dict:
+    # Contacts are scanned in the description and external links only, never in the
+    # raw page, which is mostly scripts and styles.
+    fields = about_fields(extract_initial_data(raw))
+    if not fields:
+        fields = _about_fields_from_soup(raw.decode("utf-8", errors="replace"))
+    contacts = extract_contacts(fields)
+    return dict(fields, emails=contacts.emails, telegram=contacts.telegram)
+
+
+def parse_videos_page(raw: bytes) -> List[Dict]:
+    now = datetime.utcnow()
+    return [
+        dict(record._asdict(), published=parse_published(record.published_time_text, now))
+        for record in extract_items(extract_initial_data(raw)).videos
+    ]
+
+
+async def fetch_about(channel_id: str, client: Optional[httpx.AsyncClient] = None) -> Dict:
     url = f"https://www.youtube.com/channel/{channel_id}/about"
-    async with httpx.AsyncClient(headers={"User-Agent": settings.user_agent}) as client:
-        for attempt in range(3):
-            try:
-                resp = await client.get(url)
-                if resp.status_code == 429:
-                    await asyncio.sleep(1 + attempt)
-                    continue
-                resp.raise_for_status()
-                soup = BeautifulSoup(resp.text, "html.parser")
-                title = soup.title.string if soup.title else None
-                description = " ".join(
-                    [meta.get("content") for meta in soup.find_all("meta", {"name": "description"})]
-                )
-                links = [a.get("href") for a in soup.find_all("a", href=True)]
-                emails = extract_emails_from_text(resp.text + " " + description)
-                telegram = extract_telegram(" ".join(links) + " " + description)
-                await asyncio.sleep(random.uniform(0.3, 0.8))
-                return {
-                    "title": title,
-                    "description": description,
-                    "links": links,
-                    "emails": emails,
-                    "telegram": telegram,
-                }
-            except Exception as exc:
-                logger.warning("about scrape failed: %s", exc)
-                await asyncio.sleep(1 + attempt)
+    return await memoized(url, lambda: _load_about(url, client or get_client()))
+
+
+async def _load_about(url: str, client: httpx.AsyncClient) -> Dict:
+    try:
+        resp = await fetch("GET", url, client=client)
+        resp.raise_for_status()
+        return await run_cpu(parse_about_page, resp.content)
+    except Exception as exc:
+        logger.warning("about scrape failed: %s", exc)
         return {}
 
 
-async def fetch_recent_videos(channel_id: str, limit: int = 5) -> List[Dict]:
+async def fetch_recent_videos(
+    channel_id: str, limit: int = 5, client: Optional[httpx.AsyncClient] = None
+) -> List[Dict]:
     url = f"https://www.youtube.com/channel/{channel_id}/videos"
-    async with httpx.AsyncClient(headers={"User-Agent": settings.user_agent}) as client:
-        try:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-            scripts = soup.find_all("script")
-            videos = []
-            for script in scripts:
-                if script.string and "ytInitialData" in script.string:
-                    text = script.string
-                    marker = "var ytInitialData ="
-                    if marker in text:
-                        blob = text.split(marker, 1)[1].split(";\n", 1)[0]
-                        # naive parse for videoRenderer
-                        import json
-
-                        data = json.loads(blob)
-                        queue = [data]
-                        while queue and len(videos) < limit:
-                            cur = queue.pop()
-                            if isinstance(cur, dict):
-                                if cur.get("videoId") and cur.get("title"):
-                                    published = datetime.utcnow()
-                                    videos.append(
-                                        {
-                                            "video_id": cur.get("videoId"),
-                                            "title": cur.get("title", {}).get("runs", [{}])[0].get("text"),
-                                            "published": published,
-                                            "is_short": cur.get("isShort", False),
-                                        }
-                                    )
-                                queue.extend(cur.values())
-                            elif isinstance(cur, list):
-                                queue.extend(cur)
-                    break
-            await asyncio.sleep(random.uniform(0.3, 0.8))
-            return videos[:limit]
-        except Exception as exc:
-            logger.warning("video scrape failed %s", exc)
-            return []
+    # The page is fetched and parsed once per scope; every limit is served from that parse.
+    videos = await memoized(url, lambda: _load_videos(url, client or get_client()))
+    return videos[:limit]
+
+
+async def _load_videos(url: str, client: httpx.AsyncClient) -> List[Dict]:
+    try:
+        resp = await fetch("GET", url, client=client)
+        resp.raise_for_status()
+        return await run_cpu(parse_videos_page, resp.content)
+    except Exception as exc:
+        logger.warning("video scrape failed %s", exc)
+        return []
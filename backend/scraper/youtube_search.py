@@ -1,87 +1,100 @@
 import json
-import random
-import asyncio
 import httpx
-from typing import List, Tuple, Optional
-from bs4 import BeautifulSoup
+from typing import List, Tuple, Optional, Union
 from backend.config import get_settings
 from backend.logging_config import logger
+from backend.scraper.executor import run_cpu
+from backend.scraper.http_client import fetch
+from backend.scraper.initial_data import extract_initial_data
+from backend.scraper.renderers import ChannelRecord, extract_items
 
 settings = get_settings()
 
+SEARCH_API_URL = "https://www.youtube.com/youtubei/v1/search"
 
-async def _fetch(url: str) -> str:
-    async with httpx.AsyncClient(headers={"User-Agent": settings.user_agent}) as client:
-        for attempt in range(3):
-            try:
-                resp = await client.get(url)
-                if resp.status_code == 429:
-                    await asyncio.sleep(1 + attempt)
-                    continue
-                resp.raise_for_status()
-                await asyncio.sleep(random.uniform(0.5, 1.2))
-                return resp.text
-            except Exception as exc:
-                logger.warning("search fetch failed %s", exc)
-                await asyncio.sleep(1 + attempt)
-        return ""
-
-
-def _extract_initial_data(html: str) -> Optional[dict]:
-    soup = BeautifulSoup(html, "html.parser")
-    scripts = soup.find_all("script")
-    for script in scripts:
-        if script.string and "ytInitialData" in script.string:
-            text = script.string
-            marker = "var ytInitialData ="
-            if marker in text:
-                blob = text.split(marker, 1)[1]
-                blob = blob.split(";\n", 1)[0]
-                try:
-                    return json.loads(blob)
-                except Exception:
-                    continue
-    return None
-
-
-def _walk_for_channels(data: dict) -> List[Tuple[str, str, str]]:
-    channels = []
-    if not data:
-        return channels
-    queue = [data]
-    while queue:
-        current = queue.pop()
-        if isinstance(current, dict):
-            if "channelId" in current and "title" in current:
-                name = current.get("title")
-                channel_id = current.get("channelId")
-                url = f"https://www.youtube.com/channel/{channel_id}" if channel_id else None
-                channels.append((channel_id, name, url))
-            for value in current.values():
-                queue.append(value)
-        elif isinstance(current, list):
-            queue.extend(current)
-    return channels
-
-
-async def search_channels(keyword: str) -> Tuple[List[Tuple[str, str, str]], Optional[str]]:
-    url = f"https://www.youtube.com/results?search_query={httpx.QueryParams({'search_query': keyword})['search_query']}"
-    html = await _fetch(url)
-    data = _extract_initial_data(html)
-    channels = _walk_for_channels(data)
-    continuation = None
+
+class SearchUnavailable(Exception):
+    # The page could not be fetched at all (transport error, or 429/5xx once the
+    # retries ran out, or an offline cache miss). Unlike a rejected continuation
+    # this says nothing about the keyword, so callers should keep their state.
+    pass
+
+
+def _is_transient(resp: httpx.Response) -> bool:
+    return resp.status_code == 429 or resp.status_code >= 500
+
+
+async def _fetch(url: str, client: Optional[httpx.AsyncClient] = None) -> bytes:
     try:
-        contents = data["contents"]["twoColumnSearchResultsRenderer"]["primaryContents"][
-            "sectionListRenderer"
-        ]["contents"][0]["itemSectionRenderer"]["contents"]
-        for block in contents:
-            if "continuationItemRenderer" in block:
-                continuation = (
-                    block["continuationItemRenderer"]["continuationEndpoint"]["continuationCommand"][
-                        "token"
-                    ]
-                )
-                break
-    except Exception:
-        continuation = None
-    return channels, continuation
+        resp = await fetch("GET", url, client=client)
+    except httpx.TransportError as exc:
+        raise SearchUnavailable(f"search fetch failed: {exc}") from exc
+    if _is_transient(resp):
+        raise SearchUnavailable(f"search fetch failed with {resp.status_code}")
+    if resp.is_error:
+        logger.warning("search fetch failed with %s", resp.status_code)
+        return b""
+    return resp.content
+
+
+async def _post_json(url: str, payload: dict, client: Optional[httpx.AsyncClient] = None) -> Optional[bytes]:
+    # None means the continuation was rejected (a 4xx such as an expired token).
+    try:
+        resp = await fetch("POST", url, client=client, params={"prettyPrint": "false"}, json=payload)
+    except httpx.TransportError as exc:
+        raise SearchUnavailable(f"search continuation failed: {exc}") from exc
+    if _is_transient(resp):
+        raise SearchUnavailable(f"search continuation failed with {resp.status_code}")
+    if resp.is_error:
+        logger.warning("search continuation rejected with %s", resp.status_code)
+        return None
+    return resp.content
+
+
+def _extract_initial_data(html: Union[str, bytes]) -> Optional[dict]:
+    return extract_initial_data(html)
+
+
+def parse_search_page(raw: bytes) -> Tuple[List[ChannelRecord], Optional[str]]:
+    items = extract_items(_extract_initial_data(raw))
+    return items.channels, items.continuation
+
+
+def parse_search_continuation(raw: bytes) -> Optional[Tuple[List[ChannelRecord], Optional[str]]]:
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return None
+    items = extract_items(data)
+    return items.channels, items.continuation
+
+
+def _innertube_context() -> dict:
+    return {
+        "client": {
+            "clientName": "WEB",
+            "clientVersion": settings.innertube_client_version,
+            "hl": "en",
+            "gl": "US",
+        }
+    }
+
+
+async def search_channels(
+    keyword: str, continuation: Optional[str] = None, client: Optional[httpx.AsyncClient] = None
+) -> Tuple[List[ChannelRecord], Optional[str]]:
+    # With a continuation token the next page comes from the youtubei JSON endpoint,
+    # which is a fraction of the size of the results HTML. An expired or rejected
+    # token falls back to the first page; a failed request raises SearchUnavailable
+    # so the token is not thrown away over a transient error.
+    if continuation:
+        raw = await _post_json(
+            SEARCH_API_URL, {"context": _innertube_context(), "continuation": continuation}, client=client
+        )
+        parsed = await run_cpu(parse_search_continuation, raw) if raw else None
+        if parsed is not None:
+            return parsed
+        logger.info("continuation for %s rejected, restarting from page 1", keyword)
+    url = f"https://www.youtube.com/results?search_query={httpx.QueryParams({'search_query': keyword})['search_query']}"
+    raw = await _fetch(url, client=client)
+    return await run_cpu(parse_search_page, raw)
@@ -1,43 +1,34 @@
-import asyncio
-import json
-import random
 from typing import Optional
 
 import httpx
-from bs4 import BeautifulSoup
 
 from backend.config import get_settings
 from backend.logging_config import logger
+from backend.scraper.executor import run_cpu
+from backend.scraper.fetch_cache import memoized
+from backend.scraper.http_client import fetch, get_client
+from backend.scraper.initial_data import extract_player_response
 
 settings = get_settings()
 
 
-async def fetch_description(video_id: str) -> Optional[str]:
+def parse_watch_page(raw: bytes) -> Optional[str]:
+    data = extract_player_response(raw)
+    if data is None:
+        return None
+    return data.get("videoDetails", {}).get("shortDescription", "").replace("\\n", "\n")
+
+
+async def fetch_description(video_id: str, client: Optional[httpx.AsyncClient] = None) -> Optional[str]:
     url = f"https://www.youtube.com/watch?v={video_id}"
-    async with httpx.AsyncClient(headers={"User-Agent": settings.user_agent}) as client:
-        for attempt in range(3):
-            try:
-                resp = await client.get(url)
-                if resp.status_code == 429:
-                    await asyncio.sleep(1 + attempt)
-                    continue
-                resp.raise_for_status()
-                soup = BeautifulSoup(resp.text, "html.parser")
-                for script in soup.find_all("script"):
-                    if script.string and "ytInitialPlayerResponse" in script.string:
-                        text = script.string
-                        marker = "var ytInitialPlayerResponse ="
-                        if marker in text:
-                            blob = text.split(marker, 1)[1].split(";\n", 1)[0]
-                            data = json.loads(blob)
-                            desc = (
-                                data.get("videoDetails", {})
-                                .get("shortDescription", "")
-                                .replace("\\n", "\n")
-                            )
-                            await asyncio.sleep(random.uniform(0.3, 0.6))
-                            return desc
-            except Exception as exc:
-                logger.warning("video fetch failed %s", exc)
-                await asyncio.sleep(1 + attempt)
+    return await memoized(url, lambda: _load_description(url, client or get_client()))
+
+
+async def _load_description(url: str, client: httpx.AsyncClient) -> Optional[str]:
+    try:
+        resp = await fetch("GET", url, client=client)
+        resp.raise_for_status()
+        return await run_cpu(parse_watch_page, resp.content)
+    except Exception as exc:
+        logger.warning("video fetch failed %s", exc)
         return None
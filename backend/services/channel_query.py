@@ -0,0 +1,130 @@
+import base64
+import json
+import re
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import Float, Integer, Select, and_, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import migrations
+from backend.models import Channel
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_match_expression(keyword: str) -> Optional[str]:
+    # Quotes every token so user input can never be read as FTS5 syntax, and
+    # prefix-matches each one ("bitc" finds "bitcoin").
+    tokens = _TOKEN_RE.findall(keyword or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def apply_keyword(stmt: Select, keyword: Optional[str], ranked: bool = True) -> Select:
+    if not keyword:
+        return stmt
+    match = fts_match_expression(keyword) if migrations.fts_available else None
+    if match is None:
+        return stmt.where(Channel.name.ilike(f"%{keyword}%"))
+    fts = (
+        text("SELECT rowid, rank FROM channels_fts WHERE channels_fts MATCH :match")
+        .bindparams(match=match)
+        .columns(rowid=Integer, rank=Float)
+        .subquery("fts")
+    )
+    stmt = stmt.join(fts, fts.c.rowid == Channel.id)
+    if ranked:
+        stmt = stmt.order_by(fts.c.rank)
+    return stmt
+
+
+def apply_channel_filters(
+    stmt: Select,
+    status: Optional[str] = None,
+    language: Optional[str] = None,
+    has_email: bool = False,
+    has_telegram: bool = False,
+    min_subscribers: Optional[int] = None,
+    keyword: Optional[str] = None,
+    ranked: bool = True,
+) -> Select:
+    if status:
+        stmt = stmt.where(Channel.status == status)
+    if language:
+        stmt = stmt.where(Channel.language == language)
+    if has_email:
+        stmt = stmt.where(Channel.emails != None)
+    if has_telegram:
+        stmt = stmt.where(Channel.telegram != None)
+    if min_subscribers:
+        stmt = stmt.where(Channel.subscribers >= min_subscribers)
+    return apply_keyword(stmt, keyword, ranked=ranked)
+
+
+SORT_COLUMNS = {
+    "id": Channel.id,
+    "subscribers": Channel.subscribers,
+    "last_upload_at": Channel.last_upload_at,
+    "created_at": Channel.created_at,
+}
+_DATETIME_SORTS = {"last_upload_at", "created_at"}
+
+
+def encode_cursor(sort: str, order: str, value, last_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "o": order, "v": value, "i": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        last_id = int(data["i"])
+        value = data["v"]
+    except Exception:
+        raise ValueError("malformed cursor")
+    if data.get("s") != sort or data.get("o") != order:
+        raise ValueError("cursor was issued for a different sort order")
+    if value is not None and sort in _DATETIME_SORTS:
+        value = datetime.fromisoformat(value)
+    return {"value": value, "id": last_id}
+
+
+def apply_keyset(stmt: Select, sort: str, order: str, after: Optional[Dict]) -> Select:
+    # Orders by (sort column, id) and, given the previous page's last row, seeks
+    # past it. NULL sort values go last when descending and first when ascending.
+    column = SORT_COLUMNS[sort]
+    descending = order == "desc"
+    if sort == "id":
+        if after:
+            stmt = stmt.where(Channel.id < after["id"] if descending else Channel.id > after["id"])
+        return stmt.order_by(Channel.id.desc() if descending else Channel.id.asc())
+    if after:
+        value, last_id = after["value"], after["id"]
+        if descending:
+            if value is None:
+                condition = and_(column.is_(None), Channel.id < last_id)
+            else:
+                condition = or_(column < value, and_(column == value, Channel.id < last_id), column.is_(None))
+        else:
+            if value is None:
+                condition = or_(and_(column.is_(None), Channel.id > last_id), column.is_not(None))
+            else:
+                condition = or_(column > value, and_(column == value, Channel.id > last_id))
+        stmt = stmt.where(condition)
+    if descending:
+        return stmt.order_by(column.desc().nulls_last(), Channel.id.desc())
+    return stmt.order_by(column.asc().nulls_first(), Channel.id.asc())
+
+
+async def approximate_total(db: AsyncSession, filtered: Select, unfiltered: bool, cap: int) -> int:
+    # Unfiltered: the highest id is a close enough upper bound and costs one index
+    # lookup. Filtered: count at most `cap` matching rows.
+    if unfiltered:
+        return (await db.execute(select(func.max(Channel.id)))).scalar() or 0
+    capped = filtered.with_only_columns(Channel.id).order_by(None).limit(cap).subquery()
+    return (await db.execute(select(func.count()).select_from(capped))).scalar() or 0
@@ -1,13 +1,39 @@
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.config import Settings
+from backend import metrics
+from backend.config import Settings, get_settings
 from backend.logging_config import logger
-from backend.models import Channel, DiscoveryState
+from backend.models import DiscoveryState
+from backend.scraper.renderers import parse_count
 from backend.scraper.youtube_search import search_channels
+from backend.services.events import publish
+from backend.services.ingest import insert_new_channels
+from backend.services.stats import invalidate_stats
+
+app_settings = get_settings()
+
+
+def record_yield(state: DiscoveryState, new_channels: int, now: datetime):
+    # Every cycle is one search request. The smoothed yield feeds the keyword
+    # scheduler; an exhausted keyword is cooled down for exponentially longer each
+    # time a re-probe comes back empty, and a productive cycle resets the backoff.
+    alpha = app_settings.discovery_yield_alpha
+    state.requests_made = (state.requests_made or 0) + 1
+    state.yield_ewma = (1 - alpha) * (state.yield_ewma or 0.0) + alpha * new_channels
+    if new_channels:
+        state.backoff_level = 0
+        state.cooldown_until = None
+    elif state.exhausted:
+        state.backoff_level = (state.backoff_level or 0) + 1
+        delay = min(
+            app_settings.discovery_cooldown_base * 2 ** (state.backoff_level - 1),
+            app_settings.discovery_cooldown_max,
+        )
+        state.cooldown_until = now + timedelta(seconds=delay)
 
 
 async def ensure_discovery_states(db: AsyncSession, keywords: List[str]):
@@ -20,43 +46,53 @@ async def ensure_discovery_states(db: AsyncSession, keywords: List[str]):
 
 async def run_discovery_cycle(db: AsyncSession, keyword: str, settings: Settings) -> dict:
     result = {"keyword": keyword, "new_channels": 0, "skipped": 0}
-    channels, token = await search_channels(keyword)
     state_stmt = await db.execute(select(DiscoveryState).where(DiscoveryState.keyword == keyword))
     state = state_stmt.scalars().first()
     if not state:
         state = DiscoveryState(keyword=keyword)
         db.add(state)
-    new_channel_ids = []
-    for channel_id, name, url in channels:
-        if not channel_id:
-            continue
-        existing_stmt = await db.execute(
-            select(Channel).where(Channel.youtube_channel_id == channel_id)
-        )
-        if existing_stmt.scalars().first():
-            result["skipped"] += 1
-            continue
-        channel = Channel(
-            youtube_channel_id=channel_id,
-            name=name,
-            url=url,
-            status="new",
-            last_discovered_keyword=keyword,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
-        )
-        db.add(channel)
-        new_channel_ids.append(channel_id)
-        result["new_channels"] += 1
+    resume_token = state.next_page_token
+    # End the transaction before going to the network so the writer connection is free meanwhile.
+    await db.commit()
+    # SearchUnavailable propagates before any state changes, so a transient error
+    # keeps the stored token, yield and cooldown as they are.
+    channels, token = await search_channels(keyword, continuation=resume_token)
+    rows = [
+        {
+            "youtube_channel_id": record.channel_id,
+            "name": record.name,
+            "url": record.url,
+            "subscribers": parse_count(record.subscriber_count_text),
+            "status": "new",
+            "last_discovered_keyword": keyword,
+        }
+        for record in channels
+    ]
+    ingested = await insert_new_channels(db, rows)
+    result["new_channels"] = ingested["new"]
+    result["skipped"] = ingested["skipped"]
+    result["new_channel_ids"] = ingested["new_ids"]
+    now = datetime.utcnow()
     state.next_page_token = token
     state.runs_count = (state.runs_count or 0) + 1
-    state.last_run_at = datetime.utcnow()
+    state.last_run_at = now
     if result["new_channels"] == 0:
         state.video_no_new_pages = (state.video_no_new_pages or 0) + 1
     else:
         state.video_no_new_pages = 0
     state.new_channels_found = (state.new_channels_found or 0) + result["new_channels"]
-    state.exhausted = state.video_no_new_pages >= 5
+    # Reaching the end of a continuation chain also means the keyword has run dry;
+    # the next cycle starts again from page 1.
+    state.exhausted = state.video_no_new_pages >= 5 or (bool(resume_token) and not token)
+    record_yield(state, result["new_channels"], now)
+    result["exhausted"] = state.exhausted
+    result["yield_ewma"] = state.yield_ewma
+    result["cooldown_until"] = state.cooldown_until
     await db.commit()
+    # Keyword yields and last_run_at are part of /api/stats as well as the totals.
+    invalidate_stats()
+    metrics.CHANNELS_PROCESSED.inc(result["new_channels"], stage="discovery", status="new")
+    metrics.CHANNELS_PROCESSED.inc(result["skipped"], stage="discovery", status="skipped")
+    publish("discovery.cycle", keyword=keyword, new_channels=result["new_channels"], skipped=result["skipped"])
     logger.info("Discovery cycle %s new %s skipped %s", keyword, result["new_channels"], result["skipped"])
     return result
@@ -1,73 +1,263 @@
+import asyncio
 from datetime import datetime
-from typing import List
-from sqlalchemy import select
+from typing import Awaitable, Callable, Collection, Dict, List, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend import metrics
+from backend.config import get_settings
 from backend.logging_config import logger
 from backend.models import Channel
-from backend.scraper.email_extract import extract_emails_from_text
-from backend.scraper.language_detect import detect_language_basic, detect_language_precise
-from backend.scraper.telegram_extract import extract_telegram
+from backend.scraper.contacts import scan_text
+from backend.scraper.executor import run_cpu
+from backend.scraper.fetch_cache import fetch_scope
+from backend.scraper.language_detect import detect_languages_batch
 from backend.scraper.youtube_channel import fetch_about, fetch_recent_videos
 from backend.scraper.youtube_video import fetch_description
+from backend.services.events import publish
+from backend.services.leases import acquire_leases, channel_resource, release_leases
+from backend.services.stats import invalidate_stats
 from backend.schemas import EnrichSettings
 
+app_settings = get_settings()
 
-async def enrich_channels(db: AsyncSession, channel_ids: List[int], settings: EnrichSettings):
-    results = []
-    for channel_id in channel_ids:
-        stmt = await db.execute(select(Channel).where(Channel.id == channel_id))
-        channel = stmt.scalars().first()
-        if not channel:
-            continue
+ENRICHED_FIELDS = ("name", "description", "emails", "telegram", "last_upload_at", "language")
+# Each stage stamps Channel.<stage>_checked_at when it runs.
+STAGES = ("about", "videos", "descriptions", "language")
+
+# Language detection requests arriving within this window share one executor call.
+LANGUAGE_BATCH_WINDOW = 0.02
+LANGUAGE_BATCH_SIZE = 64
+
+# Channels this process is enriching right now. Leases are per process, so this
+# keeps the pipeline, job workers and refresh scheduler off each other's channels.
+_in_flight: Set[int] = set()
+
+
+class _LanguageBatcher:
+    # Coalesces the language stage of channels that finish scraping close together
+    # into one detect_languages_batch call, so a batch costs one executor round
+    # trip instead of one per channel.
+    def __init__(self, precise: bool):
+        self.precise = precise
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def detect(self, texts: List[str]) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future))
+        if len(self._pending) >= LANGUAGE_BATCH_SIZE:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(LANGUAGE_BATCH_WINDOW, self._dispatch)
+        return await future
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.create_task(self._run(pending))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, pending: List[Tuple[List[str], asyncio.Future]]):
         try:
-            if settings.refresh_channel_metadata:
-                about = await fetch_about(channel.youtube_channel_id)
-                if about:
-                    channel.name = about.get("title") or channel.name
-                    channel.emails = ",".join(about.get("emails", [])) or channel.emails
-                    channel.telegram = about.get("telegram") or channel.telegram
-                    if about.get("links"):
-                        link_blob = " ".join(about["links"])
-                        channel.emails = ",".join(
-                            sorted(set((channel.emails or "").split(",") + extract_emails_from_text(link_blob)))
-                        )
-                        channel.telegram = channel.telegram or extract_telegram(link_blob)
-            if settings.update_last_upload:
-                videos = await fetch_recent_videos(channel.youtube_channel_id, limit=3)
-                if videos:
-                    channel.last_upload_at = max(v["published"] for v in videos)
-            descriptions = []
-            if settings.email_enabled:
-                if settings.email_mode in ("FULL", "CHANNEL_ONLY"):
-                    descriptions.append(channel.emails or "")
-                if settings.email_mode in ("FULL", "VIDEOS_ONLY"):
-                    videos = await fetch_recent_videos(channel.youtube_channel_id, limit=2)
-                    for vid in videos:
-                        desc = await fetch_description(vid["video_id"])
-                        if desc:
-                            descriptions.append(desc)
-                emails = set((channel.emails or "").split(",")) if channel.emails else set()
-                for text in descriptions:
-                    emails.update(extract_emails_from_text(text))
-                emails.discard("")
-                channel.emails = ",".join(sorted(emails)) if emails else None
-            if settings.language_enabled:
-                texts = []
-                if settings.language_mode == "BASIC":
-                    texts = [channel.name or "", channel.emails or ""]
-                    channel.language = detect_language_basic(texts)
-                else:
-                    videos = await fetch_recent_videos(channel.youtube_channel_id, limit=3)
-                    texts = [channel.name or ""] + [v["title"] for v in videos]
-                    channel.language = detect_language_precise(texts)
+            languages = await run_cpu(detect_languages_batch, [texts for texts, _ in pending], self.precise)
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+            raise
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), language in zip(pending, languages):
+            if not future.done():
+                future.set_result(language)
+
+
+def planned_stages(settings: EnrichSettings, stages: Optional[Collection[str]] = None) -> Set[str]:
+    # The stages the settings enable, narrowed to `stages` when given.
+    enabled = set()
+    if settings.refresh_channel_metadata:
+        enabled.add("about")
+    if settings.update_last_upload:
+        enabled.add("videos")
+    if settings.email_enabled and settings.email_mode in ("FULL", "VIDEOS_ONLY"):
+        enabled.add("descriptions")
+    if settings.language_enabled:
+        enabled.add("language")
+    return enabled if stages is None else enabled & set(stages)
+
+
+async def _collect(channel: Dict, settings: EnrichSettings, stages: Set[str], languages: _LanguageBatcher) -> Dict:
+    # Network and CPU work for one channel. Works on a plain snapshot so no
+    # session state is touched while other channels are in flight. Returns only
+    # the fields the given stages produced.
+    updates = {}
+    youtube_id = channel["youtube_channel_id"]
+
+    def current(field):
+        return updates.get(field, channel[field])
+
+    if "about" in stages:
+        about = await fetch_about(youtube_id)
+        if about:
+            updates["name"] = about.get("title") or channel["name"]
+            updates["description"] = about.get("description") or channel["description"]
+            updates["emails"] = ",".join(about.get("emails", [])) or channel["emails"]
+            updates["telegram"] = about.get("telegram") or channel["telegram"]
+    if "videos" in stages:
+        videos = await fetch_recent_videos(youtube_id, limit=3)
+        published = [v["published"] for v in videos if v["published"]]
+        if published:
+            updates["last_upload_at"] = max(published)
+    if settings.email_enabled and stages & {"about", "descriptions"}:
+        emails = current("emails")
+        descriptions = []
+        if settings.email_mode in ("FULL", "CHANNEL_ONLY"):
+            descriptions.append(emails or "")
+        if "descriptions" in stages:
+            videos = await fetch_recent_videos(youtube_id, limit=2)
+            for vid in videos:
+                desc = await fetch_description(vid["video_id"])
+                if desc:
+                    descriptions.append(desc)
+        found = set(emails.split(",")) if emails else set()
+        found.update(scan_text(*descriptions).emails)
+        found.discard("")
+        updates["emails"] = ",".join(sorted(found)) if found else None
+    if "language" in stages:
+        if settings.language_mode == "BASIC":
+            updates["language"] = await languages.detect([current("name") or "", current("emails") or ""])
+        else:
+            videos = await fetch_recent_videos(youtube_id, limit=3)
+            texts = [current("name") or ""] + [v["title"] or "" for v in videos]
+            updates["language"] = await languages.detect(texts)
+    return updates
+
+
+async def enrich_channels(
+    db: AsyncSession,
+    channel_ids: List[int],
+    settings: EnrichSettings,
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[Dict], Awaitable[None]]] = None,
+    stages: Optional[Dict[int, Set[str]]] = None,
+):
+    # Channels are fetched concurrently under a global limit (per-host limits are
+    # enforced by the shared HTTP client). All session access goes through one
+    # lock so reads, writes and commits on the shared AsyncSession never interleave.
+    # on_result, if given, runs under the same lock as soon as each channel finishes.
+    # stages optionally narrows the work per channel id; by default every stage the
+    # settings enable runs.
+    # Returns one result per entry of channel_ids, in that order (a repeated id is
+    # enriched once and its result repeated). Status is COMPLETED, ERROR, MISSING
+    # (no such channel) or SKIPPED: channels already being enriched, here or by
+    # another worker holding their lease, are not touched.
+    wanted = [channel_id for channel_id in dict.fromkeys(channel_ids) if channel_id not in _in_flight]
+    _in_flight.update(wanted)
+    held: List[int] = []
+    try:
+        resources = {channel_resource(channel_id): channel_id for channel_id in wanted}
+        leased = await acquire_leases(db, resources) if resources else set()
+        held = [channel_id for resource, channel_id in resources.items() if resource in leased]
+    finally:
+        _in_flight.difference_update(set(wanted) - set(held))
+    skipped = [
+        {"channel_id": channel_id, "status": "SKIPPED"}
+        for channel_id in dict.fromkeys(channel_ids)
+        if channel_id not in held
+    ]
+    for result in skipped:
+        metrics.CHANNELS_PROCESSED.inc(stage="enrichment", status="skipped")
+        if on_result:
+            try:
+                await on_result(result)
+            except Exception:
+                logger.exception("recording the enrichment result for channel %s failed", result["channel_id"])
+    limit = asyncio.Semaphore(concurrency or app_settings.enrich_concurrency)
+    db_lock = asyncio.Lock()
+    languages = _LanguageBatcher(precise=settings.language_mode != "BASIC")
+
+    async def locked(action: Callable[[], Awaitable]):
+        # Runs one unit of session work; a failure is rolled back so the shared
+        # session stays usable for the other channels.
+        async with db_lock:
+            try:
+                return await action()
+            except Exception:
+                await db.rollback()
+                raise
+
+    async def process(channel_id: int) -> Dict:
+        async def load():
+            channel = await db.get(Channel, channel_id)
+            if channel is None:
+                return None, None
+            snapshot = {field: getattr(channel, field) for field in ENRICHED_FIELDS}
+            snapshot["youtube_channel_id"] = channel.youtube_channel_id
+            # Release the connection while the channel is being scraped.
+            await db.commit()
+            return channel, snapshot
+
+        channel, snapshot = await locked(load)
+        if channel is None:
+            return {"channel_id": channel_id, "status": "MISSING"}
+        run = planned_stages(settings, stages.get(channel_id) if stages else None)
+        with fetch_scope():
+            updates = await _collect(snapshot, settings, run, languages)
+
+        async def write():
+            now = datetime.utcnow()
+            for field, value in updates.items():
+                setattr(channel, field, value)
+            for stage in run:
+                setattr(channel, f"{stage}_checked_at", now)
+            status_changed = channel.status != "active"
             channel.status = "active"
-            channel.last_checked_at = datetime.utcnow()
-            channel.updated_at = datetime.utcnow()
+            channel.last_checked_at = now
+            channel.updated_at = now
             await db.commit()
-            results.append({"channel_id": channel_id, "status": "COMPLETED"})
-        except Exception as exc:
-            logger.exception("enrichment failed for %s", channel.youtube_channel_id)
-            await db.rollback()
-            results.append({"channel_id": channel_id, "status": "ERROR", "error": str(exc)})
-    return results
+            if status_changed:
+                invalidate_stats()
+
+        await locked(write)
+        return {"channel_id": channel_id, "status": "COMPLETED"}
+
+    async def enrich_one(channel_id: int) -> Dict:
+        # Whatever goes wrong for one channel (lookup, scrape, write or the
+        # on_result callback) is logged and reported for that channel only.
+        async with limit:
+            try:
+                result = await process(channel_id)
+            except Exception as exc:
+                logger.exception("enrichment failed for channel %s", channel_id)
+                result = {"channel_id": channel_id, "status": "ERROR", "error": str(exc)}
+            publish("enrich.channel", **{result["status"].lower(): 1})
+            metrics.CHANNELS_PROCESSED.inc(stage="enrichment", status=result["status"].lower())
+            if on_result:
+                try:
+                    await locked(lambda: on_result(result))
+                except Exception:
+                    logger.exception("recording the enrichment result for channel %s failed", channel_id)
+            return result
+
+    try:
+        results = await asyncio.gather(*(enrich_one(channel_id) for channel_id in held), return_exceptions=True)
+    finally:
+        _in_flight.difference_update(held)
+        await release_leases(db, [channel_resource(channel_id) for channel_id in held])
+    by_id = {result["channel_id"]: result for result in skipped}
+    for channel_id, result in zip(held, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            logger.error("enrichment of channel %s failed", channel_id, exc_info=result)
+            result = {"channel_id": channel_id, "status": "ERROR", "error": str(result)}
+        by_id[channel_id] = result
+    return [by_id[channel_id] for channel_id in channel_ids]
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+
+from backend.config import get_settings
+from backend.logging_config import logger
+
+settings = get_settings()
+
+# Smoothing for the per-minute throughput figures.
+RATE_ALPHA = 0.3
+
+
+class EventBus:
+    # Publishers only bump in-memory counters (no awaits, no I/O), so publishing
+    # from hot paths is free. A single flusher turns the counters into at most one
+    # snapshot per events_interval, serialises it once and hands the same frame to
+    # every subscriber. Each subscriber holds only the latest frame, so a slow
+    # client skips snapshots instead of buffering them and the cost of a tab is
+    # one queue slot.
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.last: Dict[str, object] = {}
+        self.rates: Dict[str, float] = {}
+        self.recent: deque = deque(maxlen=settings.events_recent_limit)
+        self._gauges: Dict[str, Callable[[], object]] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._dirty = False
+        self._seq = 0
+        self._state: Optional[tuple] = None
+        self._previous: Dict[str, int] = {}
+        self._flushed_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    def publish(self, kind: str, **fields):
+        # e.g. publish("discovery.cycle", keyword="btc", new_channels=3, skipped=17)
+        self.counters[kind] = self.counters.get(kind, 0) + 1
+        for key, value in fields.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                name = f"{kind}.{key}"
+                self.counters[name] = self.counters.get(name, 0) + value
+            else:
+                self.last[f"{kind}.{key}"] = value
+        self.last[f"{kind}.at"] = datetime.utcnow().isoformat()
+        if kind.startswith("discovery."):
+            self.recent.append(dict(fields, kind=kind))
+        self._dirty = True
+
+    def gauge(self, name: str, read: Callable[[], object]):
+        self._gauges[name] = read
+
+    def count(self, name: str) -> int:
+        return self.counters.get(name, 0)
+
+    def snapshot(self) -> Dict:
+        return {
+            "counters": dict(self.counters),
+            "last": dict(self.last),
+            "throughput_per_min": {name: round(rate, 2) for name, rate in self.rates.items()},
+            "gauges": {name: read() for name, read in self._gauges.items()},
+            "recent": list(self.recent),
+        }
+
+    def _update_rates(self):
+        now = time.monotonic()
+        elapsed = max(now - self._flushed_at, 1e-6)
+        for name in ("discovery.cycle.new_channels", "enrich.channel"):
+            delta = self.counters.get(name, 0) - self._previous.get(name, 0)
+            per_min = delta * 60.0 / elapsed
+            self.rates[name] = (1 - RATE_ALPHA) * self.rates.get(name, per_min) + RATE_ALPHA * per_min
+            self._previous[name] = self.counters.get(name, 0)
+        self._flushed_at = now
+
+    def _build_frame(self) -> str:
+        self._seq += 1
+        payload = json.dumps(dict(self.snapshot(), ts=datetime.utcnow().isoformat()), default=str)
+        return f"id: {self._seq}\nevent: progress\ndata: {payload}\n\n"
+
+    def flush(self):
+        self._update_rates()
+        # Gauges and decaying rates move without a publish; send only on a visible change.
+        state = (
+            {name: read() for name, read in self._gauges.items()},
+            {name: round(rate, 2) for name, rate in self.rates.items()},
+        )
+        if not self._subscribers or (not self._dirty and state == self._state):
+            self._dirty = False
+            return
+        self._state = state
+        self._dirty = False
+        frame = self._build_frame()
+        self.recent.clear()
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(frame)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(settings.events_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("event flush failed")
+
+    async def stream(self, is_disconnected: Callable) -> AsyncIterator[str]:
+        # Server-sent events: the current state straight away, then coalesced
+        # updates, with a comment line as keep-alive while nothing changes.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        try:
+            yield "retry: 5000\n\n"
+            yield self._build_frame()
+            while not await is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), settings.events_keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self._subscribers.discard(queue)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+
+event_bus = EventBus()
+
+
+def publish(kind: str, **fields):
+    event_bus.publish(kind, **fields)
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List
+
+from sqlalchemy import select
+
+from backend.database import ReadSessionLocal
+from backend.models import Channel
+from backend.schemas import ChannelRead
+from backend.services.channel_query import apply_channel_filters
+
+EXPORT_FIELDS: List[str] = list(ChannelRead.__fields__)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"not serializable: {type(value)!r}")
+
+
+def _ndjson_chunk(rows: Iterable) -> bytes:
+    lines = [json.dumps(dict(zip(EXPORT_FIELDS, row)), default=_json_default) for row in rows]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunk(rows: Iterable, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+    return buffer.getvalue().encode("utf-8")
+
+
+async def iter_channel_rows(filters: Dict, fmt: str, batch_size: int) -> AsyncIterator[bytes]:
+    # Opens its own read session: the response body is produced after the request's
+    # dependencies have been torn down. Rows are fetched as plain tuples through a
+    # server-side cursor, so memory stays flat regardless of table size.
+    columns = [Channel.__table__.c[field] for field in EXPORT_FIELDS]
+    stmt = apply_channel_filters(select(*columns), ranked=False, **filters).order_by(Channel.id)
+    stmt = stmt.execution_options(yield_per=batch_size)
+    header = True
+    async with ReadSessionLocal() as session:
+        result = await session.stream(stmt)
+        async for partition in result.partitions(batch_size):
+            if fmt == "csv":
+                yield _csv_chunk(partition, header)
+            else:
+                yield _ndjson_chunk(partition)
+            header = False
+        if header and fmt == "csv":
+            yield _csv_chunk([], header)
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
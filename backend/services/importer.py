@@ -0,0 +1,76 @@
+import zlib
+from typing import AsyncIterator, Dict, List
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import get_settings
+from backend.schemas import ChannelImport
+from backend.services.ingest import upsert_channels
+from backend.services.stats import invalidate_stats
+
+settings = get_settings()
+
+GZIP_MAGIC = b"\x1f\x8b"
+MAX_REPORTED_ERRORS = 20
+
+
+async def _decompressed(chunks: AsyncIterator[bytes], gzipped: bool) -> AsyncIterator[bytes]:
+    decompressor = None
+    first = True
+    async for chunk in chunks:
+        if first:
+            first = False
+            if gzipped or chunk.startswith(GZIP_MAGIC):
+                decompressor = zlib.decompressobj(wbits=47)
+        if decompressor is None:
+            yield chunk
+        else:
+            yield decompressor.decompress(chunk)
+    if decompressor is not None:
+        yield decompressor.flush()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], gzipped: bool = False) -> AsyncIterator[bytes]:
+    pending = b""
+    async for chunk in _decompressed(chunks, gzipped):
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+async def import_ndjson(db: AsyncSession, chunks: AsyncIterator[bytes], gzipped: bool = False) -> Dict:
+    # Validates rows as they arrive and upserts them in fixed-size chunks, committing
+    # each chunk, so a bad row or a crash part way only affects its own chunk.
+    report = {"inserted": 0, "updated": 0, "rejected": 0, "errors": []}
+    batch: List[Dict] = []
+
+    async def flush():
+        outcome = await upsert_channels(db, batch)
+        await db.commit()
+        invalidate_stats()
+        report["inserted"] += outcome["inserted"]
+        report["updated"] += outcome["updated"]
+        batch.clear()
+
+    line_number = 0
+    async for line in iter_lines(chunks, gzipped):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            # Only the fields the row actually has, so an upsert never blanks the others.
+            batch.append(ChannelImport.parse_raw(line).dict(exclude_unset=True))
+        except (ValidationError, ValueError) as exc:
+            report["rejected"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"line": line_number, "error": str(exc)})
+            continue
+        if len(batch) >= settings.import_chunk_size:
+            await flush()
+    if batch:
+        await flush()
+    return report
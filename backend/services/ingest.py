@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import Channel
+
+# Rows per statement; keeps multi-row VALUES under SQLite's bound-parameter limit.
+CHUNK_SIZE = 500
+
+
+def _prepare(rows: Iterable[Dict], keep_last: bool = False) -> List[Dict]:
+    # Drops rows without an id and keeps one row per channel (the first, or the
+    # last when upserting). Rows keep only the keys they came with.
+    now = datetime.utcnow()
+    by_channel = {}
+    for row in rows:
+        channel_id = row.get("youtube_channel_id")
+        if not channel_id or (channel_id in by_channel and not keep_last):
+            continue
+        row = {key: value for key, value in row.items() if key != "id"}
+        if not row.get("status"):
+            # Inserts fall back to the column default; upserts leave the stored status alone.
+            row.pop("status", None)
+        row["created_at"] = row.get("created_at") or now
+        row["updated_at"] = row.get("updated_at") or now
+        by_channel[channel_id] = row
+    return list(by_channel.values())
+
+
+def _chunks(rows: List[Dict], size: int = CHUNK_SIZE):
+    # A multi-row VALUES clause needs the same keys in every row, and padding
+    # missing keys with None would store NULLs, so rows are grouped by key set.
+    groups: Dict[frozenset, List[Dict]] = {}
+    for row in rows:
+        groups.setdefault(frozenset(row), []).append(row)
+    for group in groups.values():
+        for start in range(0, len(group), size):
+            yield group[start:start + size]
+
+
+async def insert_new_channels(db: AsyncSession, rows: Iterable[Dict]) -> Dict:
+    # Inserts channels that are not stored yet and leaves existing ones untouched.
+    # Returns the new/skipped counts and the primary keys of the inserted rows.
+    # The caller commits.
+    prepared = _prepare(rows)
+    new_ids: List[int] = []
+    if db.get_bind().dialect.name == "sqlite":
+        for chunk in _chunks(prepared):
+            stmt = (
+                sqlite_insert(Channel)
+                .values(chunk)
+                .on_conflict_do_nothing(index_elements=[Channel.youtube_channel_id])
+                .returning(Channel.id)
+            )
+            new_ids.extend((await db.execute(stmt)).scalars().all())
+    else:
+        for chunk in _chunks(prepared):
+            existing = await db.execute(
+                select(Channel.youtube_channel_id).where(
+                    Channel.youtube_channel_id.in_([row["youtube_channel_id"] for row in chunk])
+                )
+            )
+            known = set(existing.scalars().all())
+            fresh = [row for row in chunk if row["youtube_channel_id"] not in known]
+            if fresh:
+                inserted = await db.execute(insert(Channel).values(fresh).returning(Channel.id))
+                new_ids.extend(inserted.scalars().all())
+    return {"new": len(new_ids), "skipped": len(prepared) - len(new_ids), "new_ids": new_ids}
+
+
+async def upsert_channels(db: AsyncSession, rows: Iterable[Dict]) -> Dict:
+    # Inserts new channels and updates existing ones (matched on
+    # youtube_channel_id). Only the fields present in a row are written, so a row
+    # that leaves out e.g. emails keeps the stored value; created_at is never
+    # overwritten. The caller commits.
+    prepared = _prepare(rows, keep_last=True)
+    dialect = db.get_bind().dialect.name
+    dialect_insert = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}.get(dialect)
+    inserted = updated = 0
+    for chunk in _chunks(prepared):
+        existing = await db.execute(
+            select(Channel.youtube_channel_id).where(
+                Channel.youtube_channel_id.in_([row["youtube_channel_id"] for row in chunk])
+            )
+        )
+        known = set(existing.scalars().all())
+        columns = [column for column in chunk[0] if column not in ("youtube_channel_id", "created_at")]
+        if dialect_insert is not None:
+            stmt = dialect_insert(Channel).values(chunk)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[Channel.youtube_channel_id],
+                    set_={column: stmt.excluded[column] for column in columns},
+                )
+            )
+        else:
+            # No portable upsert: insert the new rows, update the known ones one by one.
+            fresh = [row for row in chunk if row["youtube_channel_id"] not in known]
+            if fresh:
+                await db.execute(insert(Channel).values(fresh))
+            for row in chunk:
+                if row["youtube_channel_id"] in known:
+                    await db.execute(
+                        update(Channel)
+                        .where(Channel.youtube_channel_id == row["youtube_channel_id"])
+                        .values({column: row[column] for column in columns})
+                    )
+        inserted += len(chunk) - len(known)
+        updated += len(known)
+    return {"inserted": inserted, "updated": updated}
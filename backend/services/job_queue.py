@@ -0,0 +1,265 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import get_settings
+from backend.database import SessionLocal
+from backend.logging_config import logger
+from backend.models import Channel, EnrichJob, EnrichTask
+from backend.schemas import EnrichSettings
+from backend.services.enrichment import enrich_channels
+from backend.services.events import publish
+from backend.services.leases import WORKER_ID, tasks_in_flight
+
+settings = get_settings()
+
+TASK_CHUNK_SIZE = 500
+
+
+async def submit_enrich_job(
+    db: AsyncSession, settings_payload: EnrichSettings, scope: str, channel_ids: Optional[List[int]] = None
+) -> EnrichJob:
+    job = EnrichJob(scope=scope, settings=settings_payload.json(), status="queued", total=0, completed=0, failed=0)
+    db.add(job)
+    await db.flush()
+    if scope == "active":
+        # Copy ids straight across in SQL rather than pulling them into memory.
+        source = select(literal(job.id), Channel.id, literal("pending"), literal(0)).where(
+            Channel.status.in_(["new", "active"])
+        )
+        await db.execute(
+            insert(EnrichTask).from_select(["job_id", "channel_id", "status", "attempts"], source)
+        )
+    else:
+        ids = list(dict.fromkeys(channel_ids or []))
+        for start in range(0, len(ids), TASK_CHUNK_SIZE):
+            chunk = ids[start:start + TASK_CHUNK_SIZE]
+            await db.execute(
+                insert(EnrichTask).values(
+                    [{"job_id": job.id, "channel_id": cid, "status": "pending", "attempts": 0} for cid in chunk]
+                )
+            )
+    job.total = (
+        await db.execute(select(func.count()).where(EnrichTask.job_id == job.id))
+    ).scalar() or 0
+    if not job.total:
+        job.status = "completed"
+        job.finished_at = datetime.utcnow()
+    await db.commit()
+    return job
+
+
+async def job_progress(db: AsyncSession, job: EnrichJob) -> Dict:
+    rows = await db.execute(
+        select(EnrichTask.status, func.count()).where(EnrichTask.job_id == job.id).group_by(EnrichTask.status)
+    )
+    counts = {status: count for status, count in rows.all()}
+    finished = counts.get("done", 0) + counts.get("error", 0) + counts.get("cancelled", 0)
+    return dict(
+        counts,
+        job_id=job.id,
+        status=job.status,
+        total=job.total or 0,
+        percent=round(100.0 * finished / job.total, 1) if job.total else 100.0,
+    )
+
+
+async def cancel_job(db: AsyncSession, job: EnrichJob) -> EnrichJob:
+    # Pending work is dropped right away; channels already claimed finish normally.
+    job.cancel_requested = True
+    if job.status in ("queued", "running"):
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    await db.execute(
+        update(EnrichTask)
+        .where(EnrichTask.job_id == job.id, EnrichTask.status == "pending")
+        .values(status="cancelled", finished_at=datetime.utcnow())
+    )
+    await db.commit()
+    return job
+
+
+async def requeue_stale_tasks(db: AsyncSession) -> int:
+    # Live workers renew claimed_at on every heartbeat, so a claim older than the
+    # lease belongs to a worker that died; give it back to the queue, or fail it
+    # once it has used up its attempts.
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.job_lease_seconds)
+    stale = and_(EnrichTask.status == "claimed", EnrichTask.claimed_at < cutoff)
+    return await _requeue_or_fail(db, stale, "lease expired too many times")
+
+
+async def release_claimed(db: AsyncSession, task_ids: List[int]) -> int:
+    # Hands back the still-claimed tasks of a batch that failed part way. As with
+    # an expired claim the attempt counts.
+    claimed = and_(
+        EnrichTask.id.in_(task_ids), EnrichTask.status == "claimed", EnrichTask.claimed_by == WORKER_ID
+    )
+    return await _requeue_or_fail(db, claimed, "failed too many times")
+
+
+async def _requeue_or_fail(db: AsyncSession, condition, error: str) -> int:
+    requeued = await db.execute(
+        update(EnrichTask)
+        .where(condition, EnrichTask.attempts < settings.job_max_attempts)
+        .values(status="pending", claimed_at=None, claimed_by=None)
+    )
+    exhausted = (
+        await db.execute(
+            select(EnrichTask.id, EnrichTask.job_id).where(condition, EnrichTask.attempts >= settings.job_max_attempts)
+        )
+    ).all()
+    await db.commit()
+    # Failed through the checkpoint so the job's counters and completion stay right.
+    for task_id, job_id in exhausted:
+        await _checkpoint(db, job_id, task_id, {"status": "ERROR", "error": error})
+    return requeued.rowcount or 0
+
+
+async def claim_tasks(db: AsyncSession, limit: int) -> List[EnrichTask]:
+    pending = (
+        select(EnrichTask.id)
+        .where(EnrichTask.status == "pending")
+        .order_by(EnrichTask.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    claimed = await db.execute(
+        update(EnrichTask)
+        .where(EnrichTask.id.in_(pending), EnrichTask.status == "pending")
+        .values(
+            status="claimed", claimed_at=datetime.utcnow(), claimed_by=WORKER_ID, attempts=EnrichTask.attempts + 1
+        )
+        .returning(EnrichTask.id, EnrichTask.job_id, EnrichTask.channel_id)
+    )
+    rows = claimed.all()
+    if rows:
+        await db.execute(
+            update(EnrichJob)
+            .where(EnrichJob.id.in_({row.job_id for row in rows}), EnrichJob.status == "queued")
+            .values(status="running", started_at=datetime.utcnow())
+        )
+    await db.commit()
+    return rows
+
+
+async def _checkpoint(db: AsyncSession, job_id: int, task_id: int, result: Dict):
+    now = datetime.utcnow()
+    if result["status"] == "SKIPPED":
+        # Someone else is enriching the channel right now; hand the task back
+        # without using up an attempt and pick it up again once the lease is gone.
+        await db.execute(
+            update(EnrichTask)
+            .where(EnrichTask.id == task_id)
+            .values(status="pending", claimed_at=None, claimed_by=None, attempts=EnrichTask.attempts - 1)
+        )
+        await db.commit()
+        return
+    ok = result["status"] != "ERROR"
+    await db.execute(
+        update(EnrichTask)
+        .where(EnrichTask.id == task_id)
+        .values(status="done" if ok else "error", error=result.get("error"), finished_at=now)
+    )
+    publish("jobs.task", done=int(ok), failed=int(not ok))
+    counter = EnrichJob.completed if ok else EnrichJob.failed
+    await db.execute(update(EnrichJob).where(EnrichJob.id == job_id).values({counter: counter + 1}))
+    await db.execute(
+        update(EnrichJob)
+        .where(
+            EnrichJob.id == job_id,
+            EnrichJob.status == "running",
+            EnrichJob.completed + EnrichJob.failed >= EnrichJob.total,
+        )
+        .values(status="completed", finished_at=now)
+    )
+    await db.commit()
+
+
+async def run_claimed(db: AsyncSession, rows) -> int:
+    # Returns how many tasks made progress (finished or cancelled), as opposed to
+    # being handed back because another worker holds their channel.
+    progressed = 0
+    by_job = defaultdict(list)
+    for row in rows:
+        by_job[row.job_id].append(row)
+    for job_id, tasks in by_job.items():
+        job = await db.get(EnrichJob, job_id)
+        await db.commit()
+        if job is None or job.cancel_requested:
+            await db.execute(
+                update(EnrichTask)
+                .where(EnrichTask.id.in_([task.id for task in tasks]))
+                .values(status="cancelled", finished_at=datetime.utcnow())
+            )
+            await db.commit()
+            progressed += len(tasks)
+            continue
+        task_for_channel = {task.channel_id: task.id for task in tasks}
+        job_settings = EnrichSettings.parse_raw(job.settings)
+
+        async def checkpoint(result: Dict):
+            await _checkpoint(db, job_id, task_for_channel[result["channel_id"]], result)
+
+        results = await enrich_channels(db, list(task_for_channel), job_settings, on_result=checkpoint)
+        progressed += sum(1 for result in results if result["status"] != "SKIPPED")
+    return progressed
+
+
+class EnrichWorkerPool:
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        self.running = False
+
+    async def start(self, workers: Optional[int] = None):
+        if self.running:
+            return
+        self.running = True
+        async with SessionLocal() as db:
+            requeued = await requeue_stale_tasks(db)
+        if requeued:
+            logger.info("requeued %s enrichment tasks from a previous run", requeued)
+        for index in range(workers or settings.enrich_workers):
+            self._tasks.append(asyncio.create_task(self._work(index)))
+
+    async def stop(self):
+        self.running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, index: int):
+        while self.running:
+            try:
+                async with SessionLocal() as db:
+                    await requeue_stale_tasks(db)
+                    rows = await claim_tasks(db, settings.enrich_claim_batch)
+                    if rows:
+                        publish("jobs.claimed", tasks=len(rows))
+                        # Straight on to the next batch only if this one got anywhere;
+                        # tasks handed back as skipped would otherwise be reclaimed at once.
+                        if await self._run(db, rows):
+                            continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("enrichment worker %s failed", index)
+            await asyncio.sleep(settings.enrich_poll_interval)
+
+    async def _run(self, db: AsyncSession, rows) -> int:
+        with tasks_in_flight(row.id for row in rows):
+            try:
+                return await run_claimed(db, rows)
+            except Exception:
+                logger.exception("enrichment batch of %s tasks failed", len(rows))
+                await db.rollback()
+                requeued = await release_claimed(db, [row.id for row in rows])
+                logger.info("requeued %s tasks of the failed batch", requeued)
+                return 0
+
+
+enrich_workers = EnrichWorkerPool()
@@ -1,29 +1,56 @@
 import asyncio
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.config import Settings
+from backend.database import SessionLocal
 from backend.logging_config import logger
-from backend.models import Channel, DiscoveryState
+from backend.models import DiscoveryState
 from backend.schemas import EnrichSettings
+from backend.scraper.youtube_search import SearchUnavailable
 from backend.services.discovery import run_discovery_cycle
 from backend.services.enrichment import enrich_channels
+from backend.services.keyword_scheduler import KeywordScheduler, RequestBudget
+from backend.services.leases import acquire_leases, keyword_resource, release_leases
 
 
 class DiscoveryLoop:
+    # Two pipeline stages joined by a bounded queue of newly inserted channel ids.
+    # Discovery runs discovery_concurrency keywords at a time, picked by the keyword
+    # scheduler and paced by one shared request budget; enrichment workers pull ids
+    # off the queue in batches. A full queue blocks discovery until enrichment
+    # catches up. Stopping lets in-flight cycles finish and drains the queue.
     def __init__(self):
-        self._task: Optional[asyncio.Task] = None
         self.running = False
         self.current_keyword: Optional[str] = None
         self.auto_enrich: bool = True
         self.settings: Optional[Settings] = None
         self.enrich_settings: Optional[EnrichSettings] = None
+        self.scheduler: Optional[KeywordScheduler] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.new_channels = 0
+        self.enriched = 0
+        self.last_run_at: Optional[datetime] = None
+        self._done: Optional[asyncio.Event] = None
 
-    def stop(self):
+    async def stop(self):
         self.running = False
-        if self._task:
-            self._task.cancel()
+        if self._done is not None:
+            await self._done.wait()
+
+    def claim(self, auto_enrich: bool = True) -> bool:
+        # Synchronous, so a second start request cannot slip in between the check
+        # and the loop task actually starting. start() must follow a successful claim.
+        # A run that is still draining after stop() counts as busy: reviving it
+        # would restart its discoverers and swap the queue under it.
+        if self.running or self.stopping:
+            return False
+        self.running = True
+        self.auto_enrich = auto_enrich
+        self._done = asyncio.Event()
+        return True
 
     async def start(
         self,
@@ -33,25 +60,126 @@ class DiscoveryLoop:
         enrich_settings: EnrichSettings,
         run_until_stopped: bool = True,
     ):
-        self.running = True
-        self.settings = settings
-        self.enrich_settings = enrich_settings
+        discoverers: List[asyncio.Task] = []
+        enrichers: List[asyncio.Task] = []
+        try:
+            self.settings = settings
+            self.enrich_settings = enrich_settings
+            self.new_channels = 0
+            self.enriched = 0
+            states = (await db.execute(select(DiscoveryState).where(DiscoveryState.keyword.in_(keywords)))).scalars()
+            self.scheduler = KeywordScheduler(states.all())
+            await db.commit()
+            self.queue = asyncio.Queue(maxsize=settings.pipeline_queue_size)
+            budget = RequestBudget(settings.discovery_requests_per_hour)
+            # Without run_until_stopped every keyword runs once.
+            done: Set[str] = set()
+            if self.auto_enrich:
+                enrichers = [
+                    asyncio.create_task(self._enrich_stage()) for _ in range(settings.pipeline_enrich_workers)
+                ]
+            discoverers = [
+                asyncio.create_task(self._discover_stage(budget, done, run_until_stopped))
+                for _ in range(max(1, settings.discovery_concurrency))
+            ]
+            await asyncio.gather(*discoverers)
+            await self._drain()
+        finally:
+            for task in discoverers + enrichers:
+                task.cancel()
+            await asyncio.gather(*discoverers, *enrichers, return_exceptions=True)
+            self.running = False
+            self.current_keyword = None
+            self._done.set()
+
+    async def _drain(self):
+        if not self.auto_enrich:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), self.settings.pipeline_drain_timeout)
+        except asyncio.TimeoutError:
+            # Still status "new" in the database, so the refresh scheduler picks them up.
+            logger.warning("stopped with %s channels waiting for enrichment", self.queue.qsize())
+
+    async def _discover_stage(self, budget: RequestBudget, done: Set[str], run_until_stopped: bool):
+        scheduler = self.scheduler
         while self.running:
-            for kw in keywords:
-                self.current_keyword = kw
-                result = await run_discovery_cycle(db, kw, settings)
-                if result.get("new_channels") and self.auto_enrich:
-                    # enrich newly added channels (status new)
-                    stmt = await db.execute(
-                        select(Channel.id).where(Channel.last_discovered_keyword == kw)
+            kw = scheduler.pick(exclude=() if run_until_stopped else done)
+            if kw is None:
+                if not run_until_stopped and not scheduler.in_flight:
+                    return
+                await asyncio.sleep(self._idle_delay())
+                continue
+            try:
+                async with SessionLocal() as db:
+                    # The lease keeps other processes from scraping the same page.
+                    lease = keyword_resource(kw)
+                    if not await acquire_leases(db, [lease]):
+                        scheduler.defer(kw, datetime.utcnow() + timedelta(seconds=self.settings.lease_ttl))
+                        continue
+                    done.add(kw)
+                    try:
+                        await budget.acquire()
+                        if not self.running:
+                            scheduler.release(kw)
+                            return
+                        self.current_keyword = kw
+                        result = await run_discovery_cycle(db, kw, self.settings)
+                    finally:
+                        await release_leases(db, [lease])
+                scheduler.record(kw, result)
+                self.last_run_at = datetime.utcnow()
+                self.new_channels += result.get("new_channels", 0)
+                if self.auto_enrich:
+                    for channel_id in result.get("new_channel_ids", []):
+                        await self.queue.put(channel_id)
+            except asyncio.CancelledError:
+                scheduler.release(kw)
+                raise
+            except SearchUnavailable as exc:
+                scheduler.release(kw)
+                logger.warning("discovery cycle for %s skipped: %s", kw, exc)
+                await asyncio.sleep(self.settings.discovery_idle_sleep)
+            except Exception:
+                scheduler.release(kw)
+                logger.exception("discovery cycle for %s failed", kw)
+                await asyncio.sleep(self.settings.discovery_idle_sleep)
+
+    async def _enrich_stage(self):
+        batch_size = self.settings.pipeline_enrich_batch
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                async with SessionLocal() as db:
+                    results = await enrich_channels(
+                        db, batch, self.enrich_settings, concurrency=self.settings.pipeline_enrich_concurrency
                     )
-                    ids = [row[0] for row in stmt.all()]
-                    await enrich_channels(db, ids, enrich_settings)
-                await asyncio.sleep(0.5)
-                if not run_until_stopped:
-                    self.running = False
-                    break
-            await asyncio.sleep(1)
+                self.enriched += sum(1 for result in results if result["status"] == "COMPLETED")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("enrichment of %s discovered channels failed", len(batch))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _idle_delay(self) -> float:
+        # Every keyword is busy or cooling down: wait for the first cooldown to end.
+        delay = self.settings.discovery_idle_sleep
+        ready_at = self.scheduler.next_ready_at()
+        if ready_at is not None:
+            delay = min(max((ready_at - datetime.utcnow()).total_seconds(), 0.5), delay)
+        return delay
+
+    @property
+    def stopping(self) -> bool:
+        return self._done is not None and not self._done.is_set()
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize() if self.queue is not None else 0
 
 
 discovery_loop = DiscoveryLoop()
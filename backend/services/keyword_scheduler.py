@@ -0,0 +1,137 @@
+import asyncio
+import math
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+from backend.config import get_settings
+from backend.models import DiscoveryState
+
+settings = get_settings()
+
+
+class RequestBudget:
+    # Token bucket shared by every discovery worker; holds at most one minute of
+    # burst so a long idle period cannot turn into a flood.
+    def __init__(self, per_hour: float):
+        self.rate = per_hour / 3600.0
+        self.capacity = max(1.0, self.rate * 60)
+        self.tokens = 1.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class KeywordArm:
+    __slots__ = ("keyword", "requests", "yield_ewma", "cooldown_until", "exhausted", "deferred_until")
+
+    def __init__(
+        self, keyword: str, requests: int, yield_ewma: float, cooldown_until: Optional[datetime], exhausted: bool
+    ):
+        self.keyword = keyword
+        self.requests = requests
+        self.yield_ewma = yield_ewma
+        self.cooldown_until = cooldown_until
+        self.exhausted = exhausted
+        # Set while another process holds the keyword's lease; never persisted.
+        self.deferred_until: Optional[datetime] = None
+
+    def ready(self, now: datetime) -> bool:
+        return all(until is None or until <= now for until in (self.cooldown_until, self.deferred_until))
+
+    @classmethod
+    def from_state(cls, state: DiscoveryState) -> "KeywordArm":
+        return cls(
+            state.keyword,
+            state.requests_made or 0,
+            state.yield_ewma or 0.0,
+            state.cooldown_until,
+            bool(state.exhausted),
+        )
+
+
+class KeywordScheduler:
+    # UCB1 over keywords, rewarding new channels per request. Yields are
+    # normalised by the best arm so the exploration bonus stays on the same scale
+    # whatever the absolute numbers are. Keywords cooling down are skipped; once
+    # the cooldown passes they are re-probed ahead of everything else.
+    def __init__(self, states: Iterable[DiscoveryState], exploration: Optional[float] = None):
+        self.arms: Dict[str, KeywordArm] = {state.keyword: KeywordArm.from_state(state) for state in states}
+        self.exploration = settings.discovery_exploration if exploration is None else exploration
+        self.in_flight: Set[str] = set()
+
+    def _score(self, arm: KeywordArm, total: int, best: float) -> float:
+        if arm.requests == 0 or (arm.exhausted and arm.cooldown_until is not None):
+            return math.inf
+        bonus = self.exploration * math.sqrt(math.log(total + 1) / arm.requests)
+        return arm.yield_ewma / best + bonus
+
+    def pick(self, exclude: Iterable[str] = (), now: Optional[datetime] = None) -> Optional[str]:
+        now = now or datetime.utcnow()
+        excluded = self.in_flight.union(exclude)
+        ready = [
+            arm
+            for arm in self.arms.values()
+            if arm.keyword not in excluded and arm.ready(now)
+        ]
+        if not ready:
+            return None
+        total = sum(arm.requests for arm in self.arms.values())
+        best = max((arm.yield_ewma for arm in self.arms.values()), default=0.0) or 1.0
+        chosen = max(ready, key=lambda arm: self._score(arm, total, best))
+        self.in_flight.add(chosen.keyword)
+        return chosen.keyword
+
+    def record(self, keyword: str, result: Dict):
+        self.in_flight.discard(keyword)
+        arm = self.arms.get(keyword)
+        if arm is None:
+            return
+        arm.requests += 1
+        arm.yield_ewma = result.get("yield_ewma", arm.yield_ewma)
+        arm.cooldown_until = result.get("cooldown_until")
+        arm.exhausted = bool(result.get("exhausted"))
+
+    def release(self, keyword: str):
+        # A cycle that failed before recording anything.
+        self.in_flight.discard(keyword)
+
+    def defer(self, keyword: str, until: datetime):
+        # Another process is running this keyword; try the others meanwhile.
+        self.in_flight.discard(keyword)
+        arm = self.arms.get(keyword)
+        if arm is not None:
+            arm.deferred_until = until
+
+    def next_ready_at(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        now = now or datetime.utcnow()
+        waiting = [
+            until
+            for arm in self.arms.values()
+            for until in (arm.cooldown_until, arm.deferred_until)
+            if until is not None and until > now
+        ]
+        return min(waiting) if waiting else None
+
+    def snapshot(self):
+        return [
+            {
+                "keyword": arm.keyword,
+                "requests": arm.requests,
+                "yield_ewma": round(arm.yield_ewma, 3),
+                "exhausted": arm.exhausted,
+                "cooldown_until": arm.cooldown_until,
+                "in_flight": arm.keyword in self.in_flight,
+            }
+            for arm in self.arms.values()
+        ]
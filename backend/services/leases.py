@@ -0,0 +1,224 @@
+import asyncio
+import json
+import os
+import socket
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import get_settings
+from backend.database import SessionLocal
+from backend.logging_config import logger
+from backend.models import EnrichTask, Lease, Worker
+
+settings = get_settings()
+
+# Identifies this process in leases, task claims and the worker registry.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+CHUNK_SIZE = 500
+
+# Enrichment tasks this process is working on right now. Only these claims are
+# renewed: a claim left behind by a failed batch must be allowed to go stale.
+_active_tasks: Set[int] = set()
+
+
+def keyword_resource(keyword: str) -> str:
+    return f"keyword:{keyword}"
+
+
+def channel_resource(channel_id: int) -> str:
+    return f"channel:{channel_id}"
+
+
+@contextmanager
+def tasks_in_flight(task_ids: Iterable[int]):
+    ids = set(task_ids)
+    _active_tasks.update(ids)
+    try:
+        yield
+    finally:
+        _active_tasks.difference_update(ids)
+
+
+async def _acquire_portable(db: AsyncSession, chunk: List[str], now: datetime, expires_at: datetime) -> Set[str]:
+    # No portable upsert: take over the claimable rows, then insert the missing
+    # ones one by one; a unique violation means another worker got there first.
+    await db.execute(
+        update(Lease)
+        .where(Lease.resource.in_(chunk), or_(Lease.expires_at < now, Lease.owner == WORKER_ID))
+        .values(owner=WORKER_ID, acquired_at=now, expires_at=expires_at)
+    )
+    rows = (await db.execute(select(Lease.resource, Lease.owner).where(Lease.resource.in_(chunk)))).all()
+    acquired = {resource for resource, owner in rows if owner == WORKER_ID}
+    known = {resource for resource, _ in rows}
+    for resource in chunk:
+        if resource in known:
+            continue
+        try:
+            async with db.begin_nested():
+                await db.execute(
+                    insert(Lease).values(resource=resource, owner=WORKER_ID, acquired_at=now, expires_at=expires_at)
+                )
+        except IntegrityError:
+            continue
+        acquired.add(resource)
+    return acquired
+
+
+async def acquire_leases(db: AsyncSession, resources: Iterable[str], ttl: Optional[float] = None) -> Set[str]:
+    # Claims every resource that is free, expired or already ours in one upsert
+    # per chunk, and returns the ones now held. Commits.
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl or settings.lease_ttl)
+    resources = list(dict.fromkeys(resources))
+    dialect = db.get_bind().dialect.name
+    dialect_insert = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}.get(dialect)
+    acquired: Set[str] = set()
+    for start in range(0, len(resources), CHUNK_SIZE):
+        chunk = resources[start:start + CHUNK_SIZE]
+        if dialect_insert is None:
+            acquired.update(await _acquire_portable(db, chunk, now, expires_at))
+            continue
+        stmt = dialect_insert(Lease).values(
+            [
+                {"resource": resource, "owner": WORKER_ID, "acquired_at": now, "expires_at": expires_at}
+                for resource in chunk
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Lease.resource],
+            set_={"owner": stmt.excluded.owner, "acquired_at": stmt.excluded.acquired_at, "expires_at": expires_at},
+            where=or_(Lease.expires_at < now, Lease.owner == WORKER_ID),
+        ).returning(Lease.resource)
+        acquired.update((await db.execute(stmt)).scalars().all())
+    await db.commit()
+    return acquired
+
+
+async def release_leases(db: AsyncSession, resources: Iterable[str]):
+    resources = list(resources)
+    for start in range(0, len(resources), CHUNK_SIZE):
+        await db.execute(
+            delete(Lease).where(Lease.owner == WORKER_ID, Lease.resource.in_(resources[start:start + CHUNK_SIZE]))
+        )
+    await db.commit()
+
+
+async def renew_leases(db: AsyncSession):
+    # Pushes out the expiry of everything this process holds, including the
+    # enrichment tasks in flight, whose lease is their claimed_at.
+    now = datetime.utcnow()
+    await db.execute(
+        update(Lease).where(Lease.owner == WORKER_ID).values(expires_at=now + timedelta(seconds=settings.lease_ttl))
+    )
+    if _active_tasks:
+        await db.execute(
+            update(EnrichTask)
+            .where(
+                EnrichTask.id.in_(list(_active_tasks)),
+                EnrichTask.claimed_by == WORKER_ID,
+                EnrichTask.status == "claimed",
+            )
+            .values(claimed_at=now)
+        )
+    await db.commit()
+
+
+async def reap_expired(db: AsyncSession) -> int:
+    # Expired leases are free to claim anyway; deleting them keeps the table small.
+    now = datetime.utcnow()
+    reaped = await db.execute(delete(Lease).where(Lease.expires_at < now))
+    await db.execute(
+        delete(Worker).where(Worker.heartbeat_at < now - timedelta(seconds=settings.worker_timeout))
+    )
+    await db.commit()
+    return reaped.rowcount or 0
+
+
+async def report_status(db: AsyncSession, status: Dict):
+    now = datetime.utcnow()
+    worker = await db.get(Worker, WORKER_ID)
+    if worker is None:
+        worker = Worker(id=WORKER_ID, hostname=socket.gethostname(), pid=os.getpid(), started_at=now)
+        db.add(worker)
+    worker.heartbeat_at = now
+    worker.status = json.dumps(status, default=str)
+    await db.commit()
+
+
+async def cluster_status(db: AsyncSession) -> Dict:
+    # Live workers with their last reported status, plus totals across them.
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.worker_timeout)
+    workers = (await db.execute(select(Worker).where(Worker.heartbeat_at >= cutoff))).scalars().all()
+    leases = (
+        await db.execute(select(Lease.resource, Lease.owner).where(Lease.expires_at >= datetime.utcnow()))
+    ).all()
+    reports: List[Dict] = []
+    totals: Dict[str, float] = {}
+    for worker in workers:
+        status = json.loads(worker.status) if worker.status else {}
+        for key, value in status.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                totals[key] = totals.get(key, 0) + value
+        reports.append(dict(status, id=worker.id, hostname=worker.hostname, heartbeat_at=worker.heartbeat_at))
+    return {
+        "workers": reports,
+        "totals": totals,
+        "keywords_in_flight": sorted(
+            resource.split(":", 1)[1] for resource, _ in leases if resource.startswith("keyword:")
+        ),
+        "channels_leased": sum(1 for resource, _ in leases if resource.startswith("channel:")),
+    }
+
+
+class Heartbeat:
+    # Keeps this process registered: reports its status, renews its leases and
+    # task claims, and reaps whatever dead workers left behind.
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._status: Callable[[], Dict] = dict
+
+    async def start(self, status: Callable[[], Dict]):
+        if self._task is not None:
+            return
+        self._status = status
+        await self.beat()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        async with SessionLocal() as db:
+            await db.execute(delete(Lease).where(Lease.owner == WORKER_ID))
+            await db.execute(delete(Worker).where(Worker.id == WORKER_ID))
+            await db.commit()
+
+    async def beat(self):
+        async with SessionLocal() as db:
+            await report_status(db, self._status())
+            await renew_leases(db)
+            await reap_expired(db)
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(settings.heartbeat_interval)
+            try:
+                await self.beat()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("heartbeat failed")
+
+
+heartbeat = Heartbeat()
@@ -0,0 +1,206 @@
+import asyncio
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import get_settings
+from backend.database import ReadSessionLocal, SessionLocal
+from backend.logging_config import logger
+from backend.models import Channel, Setting
+from backend.schemas import EnrichSettings
+from backend.services.enrichment import enrich_channels, planned_stages
+
+settings = get_settings()
+
+# Never-checked stages count as this many TTLs overdue.
+UNCHECKED_STALENESS = 10.0
+# Candidates fetched per request of budget; they are ranked by priority in Python.
+CANDIDATES_PER_REQUEST = 4
+# Fields whose absence makes a channel worth revisiting sooner.
+TRACKED_FIELDS = ("description", "emails", "telegram", "language", "last_upload_at")
+
+
+def stage_ttls() -> Dict[str, timedelta]:
+    return {
+        "about": timedelta(hours=settings.refresh_ttl_about_hours),
+        "videos": timedelta(hours=settings.refresh_ttl_videos_hours),
+        "descriptions": timedelta(hours=settings.refresh_ttl_descriptions_hours),
+        "language": timedelta(hours=settings.refresh_ttl_language_hours),
+    }
+
+
+def stage_cost(stages: Set[str], enrich_settings: EnrichSettings) -> int:
+    # Requests a refresh is expected to make. The videos page is fetched once per
+    # channel and shared by every stage that needs it.
+    cost = 0
+    needs_videos = "videos" in stages
+    if "about" in stages:
+        cost += 1
+    if "descriptions" in stages:
+        cost += 2
+        needs_videos = True
+    if "language" in stages and enrich_settings.language_mode != "BASIC":
+        needs_videos = True
+    return cost + (1 if needs_videos else 0)
+
+
+def stale_stages(row, enabled: Set[str], ttls: Dict[str, timedelta], now: datetime) -> Dict[str, float]:
+    # Stage -> how many TTLs overdue it is, for the enabled stages that are stale.
+    stale = {}
+    for stage in enabled:
+        checked_at = getattr(row, f"{stage}_checked_at")
+        if checked_at is None:
+            stale[stage] = UNCHECKED_STALENESS
+        else:
+            overdue = (now - checked_at) / ttls[stage]
+            if overdue >= 1:
+                stale[stage] = min(overdue, UNCHECKED_STALENESS)
+    return stale
+
+
+def priority(row, staleness: float, now: datetime) -> float:
+    # Staleness is scaled up for channels that upload recently (their data changes)
+    # and for large channels (they matter more); every missing field adds a flat bonus.
+    if row.last_upload_at is None:
+        activity = 0.5
+    else:
+        days = max((now - row.last_upload_at).total_seconds() / 86400, 0.0)
+        activity = 1.0 / (1.0 + days / 7.0)
+    reach = math.log10(1 + (row.subscribers or 0)) / 7.0
+    missing = sum(1 for field in TRACKED_FIELDS if not getattr(row, field))
+    return staleness * (1.0 + activity + reach) + 0.5 * missing
+
+
+async def load_enrich_settings(db: AsyncSession) -> EnrichSettings:
+    stored = (await db.execute(select(Setting.value).where(Setting.key == "enrich"))).scalar()
+    return EnrichSettings.parse_raw(stored) if stored else EnrichSettings()
+
+
+async def plan_refresh(
+    db: AsyncSession, enrich_settings: EnrichSettings, budget: float, now: Optional[datetime] = None
+) -> Tuple[Dict[int, Set[str]], int]:
+    # Picks the highest-priority stale channels whose combined cost fits the
+    # request budget. Returns {channel_id: stale stages} and the planned cost.
+    # SQL narrows the stale rows to a budget-sized window, most overdue first
+    # (never-checked stages, then the oldest check); priority ranks that window.
+    now = now or datetime.utcnow()
+    enabled = planned_stages(enrich_settings)
+    if not enabled or budget < 1:
+        return {}, 0
+    ttls = stage_ttls()
+    columns = {stage: getattr(Channel, f"{stage}_checked_at") for stage in enabled}
+    checks = list(columns.values())
+    unchecked = case((or_(*(column.is_(None) for column in checks)), 0), else_=1)
+    if len(checks) == 1:
+        oldest = checks[0]
+    elif db.get_bind().dialect.name == "sqlite":
+        oldest = func.min(*checks)
+    else:
+        oldest = func.least(*checks)
+    stmt = select(
+        Channel.id,
+        Channel.subscribers,
+        *(getattr(Channel, field) for field in TRACKED_FIELDS if field != "last_upload_at"),
+        Channel.last_upload_at,
+        *columns.values(),
+    ).where(
+        Channel.status.in_(["new", "active"]),
+        or_(*(or_(column.is_(None), column < now - ttls[stage]) for stage, column in columns.items())),
+    ).order_by(unchecked, oldest, Channel.id).limit(int(budget) * CANDIDATES_PER_REQUEST)
+    candidates: List[Tuple[float, int, Set[str]]] = []
+    for row in (await db.execute(stmt)).all():
+        stale = stale_stages(row, enabled, ttls, now)
+        if stale:
+            candidates.append((priority(row, max(stale.values()), now), row.id, set(stale)))
+    plan: Dict[int, Set[str]] = {}
+    spent = 0
+    for _, channel_id, stages in sorted(candidates, reverse=True):
+        cost = stage_cost(stages, enrich_settings)
+        if spent + cost > budget:
+            continue
+        plan[channel_id] = stages
+        spent += cost
+    return plan, spent
+
+
+class RefreshScheduler:
+    # Re-enriches stale channels in the background at no more than
+    # refresh_requests_per_hour. Unused budget carries over for up to an hour.
+    # Off unless refresh_requests_per_hour is set: it scrapes with nobody asking.
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+        self.tokens = 0.0
+        self._updated = time.monotonic()
+        self.last_run_at: Optional[datetime] = None
+        self.last_batch = 0
+        self.last_cost = 0
+        self.refreshed = 0
+
+    def _replenish(self):
+        now = time.monotonic()
+        rate = settings.refresh_requests_per_hour
+        self.tokens = min(float(rate), self.tokens + (now - self._updated) * rate / 3600.0)
+        self._updated = now
+
+    async def start(self):
+        if self.running or settings.refresh_requests_per_hour <= 0:
+            return
+        self.running = True
+        self._updated = time.monotonic()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run_once(self) -> int:
+        self._replenish()
+        async with ReadSessionLocal() as db:
+            enrich_settings = await load_enrich_settings(db)
+            plan, cost = await plan_refresh(db, enrich_settings, self.tokens)
+        self.last_run_at = datetime.utcnow()
+        self.last_batch = len(plan)
+        self.last_cost = cost
+        if not plan:
+            return 0
+        self.tokens -= cost
+        async with SessionLocal() as db:
+            # Channels leased by the pipeline, a job or another process come back SKIPPED.
+            results = await enrich_channels(db, list(plan), enrich_settings, stages=plan)
+        refreshed = sum(1 for result in results if result["status"] == "COMPLETED")
+        self.refreshed += refreshed
+        logger.info("refreshed %s stale channels (~%s requests)", refreshed, cost)
+        return refreshed
+
+    async def _loop(self):
+        while self.running:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("refresh scheduler failed")
+            await asyncio.sleep(settings.refresh_interval)
+
+    def snapshot(self) -> Dict:
+        self._replenish()
+        return {
+            "running": self.running,
+            "requests_per_hour": settings.refresh_requests_per_hour,
+            "budget_available": round(self.tokens, 1),
+            "last_run_at": self.last_run_at,
+            "last_batch": self.last_batch,
+            "last_cost": self.last_cost,
+            "refreshed": self.refreshed,
+        }
+
+
+refresh_scheduler = RefreshScheduler()
@@ -0,0 +1,79 @@
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import migrations
+from backend.config import get_settings
+from backend.models import Channel, ChannelCounter, DiscoveryState
+
+settings = get_settings()
+
+_cache: Dict = {"expires_at": 0.0, "value": None}
+
+
+async def status_counts(db: AsyncSession) -> Dict[str, int]:
+    # Trigger-maintained counters when available, otherwise one GROUP BY over the status index.
+    if migrations.counters_available:
+        rows = await db.execute(select(ChannelCounter.status, ChannelCounter.count))
+    else:
+        rows = await db.execute(select(Channel.status, func.count()).group_by(Channel.status))
+    return {status or "": count for status, count in rows.all()}
+
+
+async def keyword_yields(db: AsyncSession):
+    rows = await db.execute(
+        select(
+            DiscoveryState.keyword,
+            DiscoveryState.runs_count,
+            DiscoveryState.new_channels_found,
+            DiscoveryState.exhausted,
+            DiscoveryState.last_run_at,
+            DiscoveryState.yield_ewma,
+            DiscoveryState.cooldown_until,
+        ).order_by(DiscoveryState.new_channels_found.desc())
+    )
+    return [
+        {
+            "keyword": keyword,
+            "runs_count": runs or 0,
+            "new_channels_found": found or 0,
+            "yield_per_run": (found or 0) / runs if runs else 0.0,
+            "exhausted": bool(exhausted),
+            "last_run_at": last_run_at,
+            "recent_yield": ewma or 0.0,
+            "cooldown_until": cooldown_until,
+        }
+        for keyword, runs, found, exhausted, last_run_at, ewma, cooldown_until in rows.all()
+    ]
+
+
+async def compute_stats(db: AsyncSession) -> Dict:
+    counts = await status_counts(db)
+    keywords = await keyword_yields(db)
+    last_runs = [row["last_run_at"] for row in keywords if row["last_run_at"]]
+    return {
+        "total": sum(counts.values()),
+        "new": counts.get("new", 0),
+        "active": counts.get("active", 0),
+        "blacklisted": counts.get("blacklisted", 0),
+        "archived": counts.get("archived", 0),
+        "last_run_at": max(last_runs) if last_runs else None,
+        "keywords": keywords,
+    }
+
+
+async def cached_stats(db: AsyncSession, ttl: Optional[float] = None) -> Dict:
+    ttl = settings.stats_cache_ttl if ttl is None else ttl
+    now = time.monotonic()
+    if _cache["value"] is None or now >= _cache["expires_at"]:
+        _cache["value"] = await compute_stats(db)
+        _cache["expires_at"] = now + ttl
+    return _cache["value"]
+
+
+def invalidate_stats():
+    # Called after commits that change status totals or keyword yields (ingest,
+    # imports, enrichment activating a channel) so the next read recomputes.
+    _cache["expires_at"] = 0.0
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import tempfile
+
+# Settings are read at import time, so configure the app before anything imports
+# it: a throwaway database, no on-disk response cache, parsing on the loop, and a
+# limiter that never waits.
+_tmp = tempfile.mkdtemp(prefix="harvester-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_tmp}/test.db")
+os.environ.setdefault("HTTP_CACHE_PATH", "")
+os.environ.setdefault("HTTP_REPLAY_DIR", "")
+os.environ.setdefault("PARSE_EXECUTOR", "inline")
+os.environ.setdefault("RATE_INITIAL", "1000")
+os.environ.setdefault("RATE_MAX", "1000")
+os.environ.setdefault("RATE_BURST", "1000")
+
+import pytest  # noqa: E402
+
+
+def run_db(coro):
+    # Each test gets its own event loop; pooled aiosqlite connections belong to the
+    # loop that opened them, so the engines are disposed before it closes.
+    from backend.database import engine, read_engine
+
+    async def run():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+            await read_engine.dispose()
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def db_tables():
+    # A migrated database with every table emptied before the test.
+    from backend.database import Base, engine, init_db
+
+    async def reset():
+        await init_db()
+        async with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                await conn.execute(table.delete())
+
+    run_db(reset())
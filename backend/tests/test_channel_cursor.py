@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from backend.database import SessionLocal
+from backend.models import Channel
+from backend.services.channel_query import SORT_COLUMNS, apply_keyset, decode_cursor, encode_cursor
+from backend.tests.conftest import run_db
+
+PAGE_SIZE = 3
+
+
+def _channels():
+    # Repeated values and NULLs in every sortable column, so pages break inside
+    # runs of ties and inside the NULL block.
+    base = datetime(2024, 1, 1)
+    channels = []
+    for n in range(11):
+        channels.append(
+            Channel(
+                youtube_channel_id=f"UC{n}",
+                subscribers=None if n % 4 == 0 else (n % 3) * 100,
+                last_upload_at=None if n % 3 == 0 else base + timedelta(days=n % 2),
+                created_at=base + timedelta(hours=n // 2),
+            )
+        )
+    return channels
+
+
+def _expected(rows, sort, order):
+    # NULLs first ascending and last descending, ties broken by id.
+    def key(row):
+        value = row[sort]
+        return (value is not None, value if value is not None else 0, row["id"])
+
+    return [row["id"] for row in sorted(rows, key=key, reverse=order == "desc")]
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("sort", sorted(SORT_COLUMNS))
+def test_cursor_walk_visits_every_row_once(db_tables, sort, order):
+    async def scenario():
+        async with SessionLocal() as db:
+            db.add_all(_channels())
+            await db.commit()
+            rows = [
+                {"id": channel.id, sort: getattr(channel, sort)}
+                for channel in (await db.execute(select(Channel))).scalars()
+            ]
+            seen, cursor = [], None
+            while True:
+                after = decode_cursor(cursor, sort, order) if cursor else None
+                stmt = apply_keyset(select(Channel), sort, order, after).limit(PAGE_SIZE + 1)
+                page = (await db.execute(stmt)).scalars().all()
+                seen.extend(channel.id for channel in page[:PAGE_SIZE])
+                if len(page) <= PAGE_SIZE:
+                    return rows, seen
+                last = page[PAGE_SIZE - 1]
+                cursor = encode_cursor(sort, order, getattr(last, sort), last.id)
+
+    rows, seen = run_db(scenario())
+    assert seen == _expected(rows, sort, order)
+
+
+def test_cursor_is_tied_to_its_sort_order():
+    cursor = encode_cursor("subscribers", "desc", 100, 7)
+    assert decode_cursor(cursor, "subscribers", "desc") == {"value": 100, "id": 7}
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "subscribers", "asc")
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor", "subscribers", "desc")
@@ -0,0 +1,37 @@
+import pytest
+
+from backend.scraper.contacts import scan_text
+
+
+@pytest.mark.parametrize(
+    "text, emails",
+    [
+        ("Business: hello@studio.example.com", ["hello@studio.example.com"]),
+        ("mail me: jane [at] gmail [dot] com", ["jane@gmail.com"]),
+        ("jane(at)gmail.com", ["jane@gmail.com"]),
+        ("jane {at} mail (dot) ru", ["jane@mail.ru"]),
+        ("logo@2x.png", []),
+    ],
+)
+def test_scan_finds_emails(text, emails):
+    assert scan_text(text).emails == emails
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I talk at length dot about stuff",
+        "We are at home dot net",
+        "Meet me at noon dot com is my favourite site",
+        "jane at gmail dot com",
+    ],
+)
+def test_prose_is_not_an_email(text):
+    assert scan_text(text).emails == []
+
+
+def test_scan_finds_telegram():
+    contacts = scan_text("chat: https://t.me/studio_chat or ping @studio_owner")
+    assert contacts.telegram_links == ["@studio_chat"]
+    assert contacts.handles == ["@studio_owner"]
+    assert contacts.telegram == "@studio_chat"
@@ -0,0 +1,39 @@
+import asyncio
+
+from backend.services.jobs import DiscoveryLoop
+
+
+def test_claim_is_refused_until_a_stopped_run_has_drained():
+    async def scenario():
+        loop = DiscoveryLoop()
+        assert loop.claim()
+        assert not loop.claim()
+        stopping = asyncio.create_task(loop.stop())
+        await asyncio.sleep(0)
+        # stop() has cleared running but the run has not finished draining.
+        refused_while_draining = not loop.running and not loop.claim()
+        loop._done.set()
+        await stopping
+        return refused_while_draining, loop.claim()
+
+    assert asyncio.run(scenario()) == (True, True)
+
+
+def test_failed_setup_releases_the_loop():
+    class BrokenSession:
+        async def execute(self, *args, **kwargs):
+            raise RuntimeError("database is locked")
+
+    async def scenario():
+        from backend.config import get_settings
+
+        loop = DiscoveryLoop()
+        assert loop.claim()
+        try:
+            await loop.start(BrokenSession(), ["bitcoin"], get_settings(), None)
+        except RuntimeError:
+            pass
+        await asyncio.wait_for(loop.stop(), 1)
+        return loop.running, loop.claim()
+
+    assert asyncio.run(scenario()) == (False, True)
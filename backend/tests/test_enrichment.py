@@ -0,0 +1,78 @@
+from backend.database import SessionLocal
+from backend.models import Channel
+from backend.schemas import EnrichSettings
+from backend.services import enrichment
+from backend.services.enrichment import enrich_channels
+from backend.tests.conftest import run_db
+
+ABOUT_ONLY = EnrichSettings(
+    refresh_channel_metadata=True, update_last_upload=False, email_enabled=False, language_enabled=False
+)
+
+
+def _about(titles):
+    async def fetch_about(youtube_id):
+        if youtube_id == "UCbroken":
+            raise RuntimeError("about page changed")
+        return {"title": titles.get(youtube_id)}
+
+    return fetch_about
+
+
+async def _add(*youtube_ids):
+    async with SessionLocal() as db:
+        channels = [Channel(youtube_channel_id=youtube_id, status="new") for youtube_id in youtube_ids]
+        db.add_all(channels)
+        await db.commit()
+        return [channel.id for channel in channels]
+
+
+def test_results_follow_the_requested_order(db_tables, monkeypatch):
+    monkeypatch.setattr(enrichment, "fetch_about", _about({"UCa": "A", "UCb": "B"}))
+
+    async def scenario():
+        a, b, busy, broken = await _add("UCa", "UCb", "UCbusy", "UCbroken")
+        enrichment._in_flight.add(busy)
+        try:
+            async with SessionLocal() as db:
+                results = await enrich_channels(db, [b, 999, busy, a, broken, b], ABOUT_ONLY)
+        finally:
+            enrichment._in_flight.discard(busy)
+        return [a, b, busy, broken], results
+
+    (a, b, busy, broken), results = run_db(scenario())
+    assert [(result["channel_id"], result["status"]) for result in results] == [
+        (b, "COMPLETED"),
+        (999, "MISSING"),
+        (busy, "SKIPPED"),
+        (a, "COMPLETED"),
+        (broken, "ERROR"),
+        (b, "COMPLETED"),
+    ]
+    assert "about page changed" in results[4]["error"]
+
+
+def test_write_leaves_fields_of_stages_that_did_not_run(db_tables):
+    language_only = EnrichSettings(
+        refresh_channel_metadata=False,
+        update_last_upload=False,
+        email_enabled=True,
+        email_mode="CHANNEL_ONLY",
+        language_enabled=True,
+        language_mode="BASIC",
+    )
+
+    async def scenario():
+        async with SessionLocal() as db:
+            channel = Channel(youtube_channel_id="UCa", name="Cooking daily", emails="b@example.com,a@example.com")
+            db.add(channel)
+            await db.commit()
+            await enrich_channels(db, [channel.id], language_only)
+        async with SessionLocal() as db:
+            return await db.get(Channel, channel.id)
+
+    channel = run_db(scenario())
+    assert channel.language
+    assert channel.emails == "b@example.com,a@example.com"
+    assert channel.language_checked_at is not None
+    assert channel.about_checked_at is None
@@ -0,0 +1,102 @@
+import json
+from datetime import datetime
+
+from sqlalchemy import delete, select
+
+from backend.database import SessionLocal
+from backend.models import Channel
+from backend.services.export import gzip_stream, iter_channel_rows
+from backend.services.importer import import_ndjson
+from backend.tests.conftest import run_db
+
+NO_FILTERS = {
+    "status": None,
+    "language": None,
+    "has_email": False,
+    "has_telegram": False,
+    "min_subscribers": None,
+    "keyword": None,
+}
+
+
+async def _pieces(data: bytes, size: int = 7):
+    # Small uneven chunks, so lines and the gzip stream are split mid-way.
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _export(gzipped: bool) -> bytes:
+    body = iter_channel_rows(NO_FILTERS, "ndjson", batch_size=2)
+    if gzipped:
+        body = gzip_stream(body)
+    return b"".join([chunk async for chunk in body])
+
+
+def test_export_then_import_round_trip(db_tables):
+    async def scenario():
+        async with SessionLocal() as db:
+            db.add_all(
+                [
+                    Channel(
+                        youtube_channel_id=f"UC{n}",
+                        name=f"Channel {n}",
+                        emails=f"owner{n}@example.com",
+                        subscribers=n * 1000,
+                        status="active",
+                        last_upload_at=datetime(2024, 5, n + 1),
+                    )
+                    for n in range(5)
+                ]
+            )
+            await db.commit()
+        exported = await _export(gzipped=True)
+
+        async with SessionLocal() as db:
+            # Lose one channel and edit another; the import restores both.
+            await db.execute(delete(Channel).where(Channel.youtube_channel_id == "UC0"))
+            channel = (await db.execute(select(Channel).where(Channel.youtube_channel_id == "UC1"))).scalar_one()
+            channel.name = "Renamed"
+            await db.commit()
+            before = {row.youtube_channel_id: row.created_at for row in (await db.execute(select(Channel))).scalars()}
+
+        async with SessionLocal() as db:
+            report = await import_ndjson(db, _pieces(exported), gzipped=True)
+            extra = b"\n".join(
+                [
+                    json.dumps({"youtube_channel_id": "UCnew", "name": "Brand new"}).encode(),
+                    json.dumps({"youtube_channel_id": "UC2", "subscribers": 99}).encode(),
+                    b'{"name": "no id"}',
+                    b"not json",
+                ]
+            )
+            extra_report = await import_ndjson(db, _pieces(extra))
+        async with SessionLocal() as db:
+            channels = {row.youtube_channel_id: row for row in (await db.execute(select(Channel))).scalars()}
+        return before, report, extra_report, channels
+
+    before, report, extra_report, channels = run_db(scenario())
+    assert report == {"inserted": 1, "updated": 4, "rejected": 0, "errors": []}
+    assert extra_report["inserted"] == 1 and extra_report["updated"] == 1
+    assert extra_report["rejected"] == 2
+    assert [error["line"] for error in extra_report["errors"]] == [3, 4]
+
+    assert set(channels) == {"UC0", "UC1", "UC2", "UC3", "UC4", "UCnew"}
+    assert channels["UC0"].name == "Channel 0"
+    assert channels["UC0"].last_upload_at == datetime(2024, 5, 1)
+    assert channels["UC1"].name == "Channel 1"
+    assert channels["UC1"].created_at == before["UC1"]
+    # A partial row only touches the fields it carries.
+    assert channels["UC2"].subscribers == 99
+    assert channels["UC2"].name == "Channel 2" and channels["UC2"].emails == "owner2@example.com"
+    assert channels["UCnew"].status == "new"
+
+
+def test_export_is_one_json_object_per_channel(db_tables):
+    async def scenario():
+        async with SessionLocal() as db:
+            db.add_all([Channel(youtube_channel_id=f"UC{n}", name=f"Channel {n}") for n in range(3)])
+            await db.commit()
+        return await _export(gzipped=False)
+
+    lines = run_db(scenario()).decode("utf-8").splitlines()
+    assert [json.loads(line)["youtube_channel_id"] for line in lines] == ["UC0", "UC1", "UC2"]
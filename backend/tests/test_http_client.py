@@ -0,0 +1,120 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend.config import get_settings
+from backend.scraper import http_client
+from backend.scraper.http_client import build_client, fetch
+from backend.scraper.youtube_channel import fetch_about
+
+
+def _run(handler, body):
+    # Runs body(client) against a client built around a MockTransport, the same
+    # way tests and tools inject a stand-in transport.
+    async def run():
+        client = build_client(httpx.MockTransport(handler))
+        try:
+            return await asyncio.wait_for(body(client), 10)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def test_fetch_past_the_per_host_limit():
+    requests = 3 * get_settings().http_per_host_limit
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=request.url.params["n"])
+
+    async def body(client):
+        sequential = [await fetch("GET", f"https://example.com/page?n={n}", client=client) for n in range(requests)]
+        concurrent = await asyncio.gather(
+            *(fetch("GET", f"https://example.com/page?n={n}", client=client) for n in range(requests))
+        )
+        return sequential + concurrent
+
+    responses = _run(handler, body)
+    assert [response.text for response in responses] == [str(n) for n in range(requests)] * 2
+
+
+def test_fetch_retries_throttled_responses():
+    statuses = [429, 503, 200]
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        return httpx.Response(statuses[len(seen) - 1], text="ok")
+
+    response = _run(handler, lambda client: fetch("GET", "https://example.com/retry", client=client))
+    assert response.status_code == 200
+    assert len(seen) == 3
+
+
+def test_fetch_returns_last_response_when_retries_run_out():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    response = _run(handler, lambda client: fetch("GET", "https://example.com/down", client=client, attempts=2))
+    assert response.status_code == 503
+
+
+def test_fetch_raises_the_last_transport_error():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    with pytest.raises(httpx.ConnectError):
+        _run(handler, lambda client: fetch("GET", "https://example.com/refused", client=client, attempts=2))
+
+
+def test_fetch_about_through_the_shared_client():
+    page = (
+        "<html><head><title>Crypto Daily</title>"
+        '<meta name="description" content="Business inquiries: team@cryptodaily.io">'
+        '</head><body><a href="https://t.me/cryptodaily">Telegram</a></body></html>'
+    )
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        return httpx.Response(200, text=page)
+
+    async def run():
+        await http_client.open_client(httpx.MockTransport(handler))
+        try:
+            return await fetch_about("UCcryptodaily")
+        finally:
+            await http_client.close_client()
+
+    about = asyncio.run(run())
+    assert seen == ["https://www.youtube.com/channel/UCcryptodaily/about"]
+    assert about["title"] == "Crypto Daily"
+    assert about["emails"] == ["team@cryptodaily.io"]
+    assert about["telegram"]
+
+
+@pytest.mark.parametrize(
+    "url", ["https://www.youtube.com/channel/UCx/about", "https://example.com/not-a-page-class"]
+)
+def test_offline_miss_never_reaches_the_network(monkeypatch, url):
+    # The suite runs without a response cache, so every request is a miss.
+    monkeypatch.setattr(http_client.settings, "http_cache_offline", True)
+    monkeypatch.setattr(http_client.settings, "http_cache_path", "./unused.db")
+    monkeypatch.setattr(http_client, "get_response_cache", lambda: None)
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url)
+        return httpx.Response(200)
+
+    response = _run(handler, lambda client: fetch("GET", url, client=client))
+    assert response.status_code == 504
+    assert seen == []
+
+
+def test_offline_needs_a_cache_path(monkeypatch):
+    monkeypatch.setattr(http_client.settings, "http_cache_offline", True)
+    monkeypatch.setattr(http_client.settings, "http_cache_path", "")
+    with pytest.raises(ValueError):
+        build_client(httpx.MockTransport(lambda request: httpx.Response(200)))
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from backend.database import SessionLocal
+from backend.models import Channel, EnrichJob, EnrichTask
+from backend.schemas import EnrichSettings
+from backend.services import job_queue
+from backend.services.leases import _active_tasks, renew_leases, tasks_in_flight
+from backend.tests.conftest import run_db
+
+
+async def _submit(channels: int) -> int:
+    async with SessionLocal() as db:
+        db.add_all(
+            Channel(youtube_channel_id=f"UC{index}", name=f"channel {index}", status="new")
+            for index in range(channels)
+        )
+        await db.commit()
+        ids = (await db.execute(select(Channel.id))).scalars().all()
+        job = await job_queue.submit_enrich_job(db, EnrichSettings(), "selected", ids)
+        return job.id
+
+
+async def _tasks(job_id: int):
+    async with SessionLocal() as db:
+        rows = await db.execute(
+            select(EnrichTask.status, EnrichTask.attempts, EnrichTask.claimed_by).where(EnrichTask.job_id == job_id)
+        )
+        return rows.all()
+
+
+def test_failed_batch_is_requeued(db_tables, monkeypatch):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(job_queue, "enrich_channels", broken)
+
+    async def scenario():
+        job_id = await _submit(3)
+        async with SessionLocal() as db:
+            rows = await job_queue.claim_tasks(db, 10)
+            progressed = await job_queue.EnrichWorkerPool()._run(db, rows)
+        return progressed, await _tasks(job_id)
+
+    progressed, tasks = run_db(scenario())
+    assert progressed == 0
+    assert [(status, attempts, claimed_by) for status, attempts, claimed_by in tasks] == [("pending", 1, None)] * 3
+    assert not _active_tasks
+
+
+def test_batch_out_of_attempts_fails_the_job(db_tables, monkeypatch):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(job_queue, "enrich_channels", broken)
+    monkeypatch.setattr(job_queue.settings, "job_max_attempts", 1)
+
+    async def scenario():
+        job_id = await _submit(2)
+        async with SessionLocal() as db:
+            rows = await job_queue.claim_tasks(db, 10)
+            await job_queue.EnrichWorkerPool()._run(db, rows)
+            job = await db.get(EnrichJob, job_id)
+            return job.status, job.failed, await _tasks(job_id)
+
+    status, failed, tasks = run_db(scenario())
+    assert (status, failed) == ("completed", 2)
+    assert {task.status for task in tasks} == {"error"}
+
+
+def test_heartbeat_renews_only_tasks_in_flight(db_tables):
+    old = datetime.utcnow() - timedelta(hours=1)
+
+    async def claimed_at(db, task_id):
+        return (await db.execute(select(EnrichTask.claimed_at).where(EnrichTask.id == task_id))).scalar()
+
+    async def scenario():
+        await _submit(2)
+        async with SessionLocal() as db:
+            running, abandoned = (row.id for row in await job_queue.claim_tasks(db, 10))
+            await db.execute(update(EnrichTask).values(claimed_at=old))
+            await db.commit()
+            with tasks_in_flight([running]):
+                await renew_leases(db)
+            renewed = await claimed_at(db, running) > old
+            kept = await claimed_at(db, abandoned) == old
+            requeued = await job_queue.requeue_stale_tasks(db)
+            return renewed, kept, requeued
+
+    assert run_db(scenario()) == (True, True, 1)
+
+
+def test_job_lifecycle(db_tables, monkeypatch):
+    async def fake_enrich(db, channel_ids, job_settings, on_result=None, **kwargs):
+        results = []
+        for channel_id in channel_ids:
+            result = (
+                {"channel_id": channel_id, "status": "COMPLETED"}
+                if channel_id % 2
+                else {"channel_id": channel_id, "status": "ERROR", "error": "about page changed"}
+            )
+            await on_result(result)
+            results.append(result)
+        return results
+
+    monkeypatch.setattr(job_queue, "enrich_channels", fake_enrich)
+
+    async def scenario():
+        job_id = await _submit(5)
+        steps = []
+        async with SessionLocal() as db:
+            # Two channels enriched: one succeeds, one fails.
+            rows = await job_queue.claim_tasks(db, 2)
+            steps.append(await job_queue.run_claimed(db, rows))
+            job = await db.get(EnrichJob, job_id)
+            await db.refresh(job)
+            steps.append((job.status, job.completed, job.failed))
+
+            # A worker dies holding a claim: it goes back to the queue.
+            (lost,) = await job_queue.claim_tasks(db, 1)
+            await db.execute(
+                update(EnrichTask).where(EnrichTask.id == lost.id).values(claimed_at=datetime(2000, 1, 1))
+            )
+            await db.commit()
+            steps.append(await job_queue.requeue_stale_tasks(db))
+
+            # Cancelling drops pending work; a claim taken before it finishes as cancelled.
+            (late,) = await job_queue.claim_tasks(db, 1)
+            await job_queue.cancel_job(db, job)
+            steps.append(await job_queue.claim_tasks(db, 10))
+            steps.append(await job_queue.run_claimed(db, [late]))
+            steps.append(await job_queue.job_progress(db, job))
+        return steps, await _tasks(job_id)
+
+    (ran, counters, requeued, after_cancel, cancelled, progress), tasks = run_db(scenario())
+    assert ran == 2
+    assert counters == ("running", 1, 1)
+    assert requeued == 1
+    assert after_cancel == []
+    assert cancelled == 1
+    assert progress["status"] == "cancelled"
+    assert (progress["done"], progress["error"], progress["cancelled"]) == (1, 1, 3)
+    assert progress["percent"] == 100.0
+    assert sorted(status for status, _, _ in tasks) == ["cancelled"] * 3 + ["done", "error"]
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from backend.database import SessionLocal
+from backend.models import Lease
+from backend.services import leases
+from backend.services.leases import WORKER_ID, acquire_leases
+from backend.tests.conftest import run_db
+
+
+def _scenario(acquire):
+    async def scenario():
+        now = datetime.utcnow()
+        async with SessionLocal() as db:
+            db.add_all(
+                [
+                    Lease(resource="held", owner="other", acquired_at=now, expires_at=now + timedelta(minutes=5)),
+                    Lease(resource="expired", owner="other", acquired_at=now, expires_at=now - timedelta(minutes=5)),
+                    Lease(resource="mine", owner=WORKER_ID, acquired_at=now, expires_at=now + timedelta(minutes=5)),
+                ]
+            )
+            await db.commit()
+            acquired = await acquire(db, ["held", "expired", "mine", "free"])
+            owners = dict((await db.execute(select(Lease.resource, Lease.owner))).all())
+            return acquired, owners
+
+    return run_db(scenario())
+
+
+EXPECTED_OWNERS = {"held": "other", "expired": WORKER_ID, "mine": WORKER_ID, "free": WORKER_ID}
+
+
+def test_acquire_takes_free_expired_and_own_leases(db_tables):
+    acquired, owners = _scenario(acquire_leases)
+    assert acquired == {"expired", "mine", "free"}
+    assert owners == EXPECTED_OWNERS
+
+
+def test_portable_acquire_matches_the_upsert(db_tables):
+    async def acquire(db, resources):
+        now = datetime.utcnow()
+        acquired = await leases._acquire_portable(db, resources, now, now + timedelta(minutes=5))
+        await db.commit()
+        return acquired
+
+    acquired, owners = _scenario(acquire)
+    assert acquired == {"expired", "mine", "free"}
+    assert owners == EXPECTED_OWNERS
@@ -0,0 +1,67 @@
+from sqlalchemy import create_engine, inspect
+
+from backend import migrations
+from backend.database import Base
+from backend.migrations import MIGRATIONS, SCHEMA_VERSION_KEY, run_migrations
+
+# The tables as the first release created them, before any migration existed.
+BASELINE_SCHEMA = [
+    "CREATE TABLE channels (id INTEGER PRIMARY KEY, youtube_channel_id VARCHAR NOT NULL UNIQUE, "
+    "name VARCHAR, url VARCHAR, subscribers INTEGER, language VARCHAR, emails TEXT, telegram VARCHAR, "
+    "status VARCHAR, last_upload_at DATETIME, last_checked_at DATETIME, last_discovered_keyword VARCHAR, "
+    "created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE discovery_state (id INTEGER PRIMARY KEY, keyword VARCHAR UNIQUE, next_page_token TEXT, "
+    "runs_count INTEGER, new_channels_found INTEGER, exhausted BOOLEAN, last_run_at DATETIME, "
+    "video_no_new_pages INTEGER)",
+    "CREATE TABLE settings (key VARCHAR PRIMARY KEY, value TEXT)",
+    "INSERT INTO channels (youtube_channel_id, name, emails, status, last_checked_at) VALUES "
+    "('UCcook', 'Weekend Cooking', 'chef@example.com', 'active', '2024-01-02 00:00:00'), "
+    "('UCgame', 'Retro Games', NULL, 'new', NULL), "
+    "('UCtech', 'Tech Reviews', NULL, 'active', NULL)",
+    "INSERT INTO discovery_state (keyword, runs_count, new_channels_found) VALUES ('cooking', 4, 10)",
+]
+
+
+def test_migrations_upgrade_a_baseline_database(tmp_path, monkeypatch):
+    # run_migrations records what it found in module globals; keep the suite's values.
+    monkeypatch.setattr(migrations, "fts_available", migrations.fts_available)
+    monkeypatch.setattr(migrations, "counters_available", migrations.counters_available)
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.exec_driver_sql(statement)
+    # Twice, as two restarts would: the second run must find nothing left to do.
+    for _ in range(2):
+        with engine.begin() as conn:
+            Base.metadata.create_all(conn)
+            run_migrations(conn)
+
+    with engine.connect() as conn:
+        columns = {column["name"] for column in inspect(conn).get_columns("channels")}
+        assert {"description", "about_checked_at", "language_checked_at"} <= columns
+        indexes = {index["name"] for index in inspect(conn).get_indexes("channels")}
+        assert {index.name for index in Base.metadata.tables["channels"].indexes} <= indexes
+        version = conn.exec_driver_sql("SELECT value FROM settings WHERE key = ?", (SCHEMA_VERSION_KEY,)).scalar()
+        assert int(version) == MIGRATIONS[-1][0]
+        assert migrations.fts_available and migrations.counters_available
+
+        found = conn.exec_driver_sql("SELECT rowid FROM channels_fts WHERE channels_fts MATCH 'cooking'").all()
+        assert len(found) == 1
+        counters = dict(conn.exec_driver_sql("SELECT status, count FROM channel_counters").all())
+        assert counters == {"active": 2, "new": 1}
+        checked = conn.exec_driver_sql(
+            "SELECT about_checked_at FROM channels WHERE youtube_channel_id = 'UCcook'"
+        ).scalar()
+        assert checked is not None
+        state = conn.exec_driver_sql("SELECT requests_made, yield_ewma FROM discovery_state").one()
+        assert tuple(state) == (4, 2.5)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "UPDATE channels SET status = 'active', name = 'Retro Cooking' WHERE youtube_channel_id = 'UCgame'"
+        )
+        counters = dict(conn.exec_driver_sql("SELECT status, count FROM channel_counters").all())
+        assert counters["active"] == 3 and counters["new"] == 0
+        found = conn.exec_driver_sql("SELECT rowid FROM channels_fts WHERE channels_fts MATCH 'cooking'").all()
+        assert len(found) == 2
+    engine.dispose()
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from backend.database import SessionLocal
+from backend.models import Channel
+from backend.schemas import EnrichSettings
+from backend.services.refresh import plan_refresh
+from backend.tests.conftest import run_db
+
+ABOUT_ONLY = EnrichSettings(
+    refresh_channel_metadata=True, update_last_upload=False, email_enabled=False, language_enabled=False
+)
+
+
+def test_plan_fits_the_budget_and_prefers_unchecked(db_tables):
+    now = datetime.utcnow()
+
+    async def scenario():
+        async with SessionLocal() as db:
+            db.add_all(
+                [
+                    Channel(youtube_channel_id="UCfresh", status="active", about_checked_at=now),
+                    Channel(youtube_channel_id="UCold", status="active", about_checked_at=now - timedelta(days=60)),
+                    Channel(youtube_channel_id="UCnever", status="new"),
+                    Channel(youtube_channel_id="UCblocked", status="blacklisted"),
+                ]
+                + [
+                    Channel(youtube_channel_id=f"UCstale{index}", status="active", about_checked_at=now - timedelta(days=20))
+                    for index in range(10)
+                ]
+            )
+            await db.commit()
+            plan, cost = await plan_refresh(db, ABOUT_ONLY, budget=2, now=now)
+            names = {
+                channel.youtube_channel_id: channel.id
+                for channel in (await db.execute(Channel.__table__.select())).all()
+            }
+            return plan, cost, names
+
+    plan, cost, ids = run_db(scenario())
+    assert cost == 2
+    assert set(plan) == {ids["UCnever"], ids["UCold"]}
+    assert all(stages == {"about"} for stages in plan.values())
+
+
+def test_no_budget_plans_nothing(db_tables):
+    async def scenario():
+        async with SessionLocal() as db:
+            db.add(Channel(youtube_channel_id="UCnever", status="new"))
+            await db.commit()
+            return await plan_refresh(db, ABOUT_ONLY, budget=0)
+
+    assert run_db(scenario()) == ({}, 0)
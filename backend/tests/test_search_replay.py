@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from backend.config import get_settings
+from backend.scraper.http_client import build_client
+from backend.scraper.replay import ReplayTransport, request_key, save_recording
+from backend.scraper.youtube_search import SEARCH_API_URL, SearchUnavailable, search_channels
+
+PAGES = 8
+
+
+def _channel(index: int) -> dict:
+    return {
+        "channelRenderer": {
+            "channelId": f"UC{index:022d}",
+            "title": {"simpleText": f"Channel {index}"},
+            "videoCountText": {"simpleText": f"{index}K subscribers"},
+        }
+    }
+
+
+def _continuation(token: str) -> dict:
+    return {"continuationItemRenderer": {"continuationEndpoint": {"continuationCommand": {"token": token}}}}
+
+
+def _first_page(keyword: str) -> str:
+    data = {
+        "contents": {
+            "twoColumnSearchResultsRenderer": {
+                "primaryContents": {
+                    "sectionListRenderer": {
+                        "contents": [
+                            {"itemSectionRenderer": {"contents": [_channel(0), _channel(1)]}},
+                            _continuation("token-1"),
+                        ]
+                    }
+                }
+            }
+        }
+    }
+    return f"<html><script>var ytInitialData = {json.dumps(data)};</script></html>"
+
+
+def _next_page(page: int) -> str:
+    items = [{"itemSectionRenderer": {"contents": [_channel(page * 2), _channel(page * 2 + 1)]}}]
+    if page + 1 < PAGES:
+        items.append(_continuation(f"token-{page + 1}"))
+    return json.dumps({"onResponseReceivedCommands": [{"appendContinuationItemsAction": {"continuationItems": items}}]})
+
+
+def _search_url(keyword: str) -> str:
+    return f"https://www.youtube.com/results?search_query={keyword}"
+
+
+def _continuation_request(token: str) -> httpx.Request:
+    return httpx.Request("POST", SEARCH_API_URL, json={"continuation": token})
+
+
+def _record(directory, keyword: str):
+    save_recording(directory, request_key(httpx.Request("GET", _search_url(keyword))), 200, {}, _first_page(keyword))
+    for page in range(1, PAGES):
+        save_recording(directory, request_key(_continuation_request(f"token-{page}")), 200, {}, _next_page(page))
+
+
+async def _walk(client: httpx.AsyncClient, keyword: str):
+    pages = []
+    token = None
+    while True:
+        channels, token = await search_channels(keyword, continuation=token, client=client)
+        pages.append([record.channel_id for record in channels])
+        if not token:
+            return pages
+
+
+def test_replays_first_page_and_continuations(tmp_path):
+    # More pages than http_per_host_limit, so a leaked per-host slot would hang here.
+    assert PAGES > get_settings().http_per_host_limit
+    _record(tmp_path, "bitcoin")
+
+    async def run():
+        client = build_client(ReplayTransport(tmp_path))
+        try:
+            return await asyncio.wait_for(_walk(client, "bitcoin"), 10)
+        finally:
+            await client.aclose()
+
+    pages = asyncio.run(run())
+    assert len(pages) == PAGES
+    assert pages[0] == [f"UC{0:022d}", f"UC{1:022d}"]
+    assert pages[-1] == [f"UC{(PAGES - 1) * 2:022d}", f"UC{(PAGES - 1) * 2 + 1:022d}"]
+
+
+def _search_with(handler, continuation: str):
+    async def run():
+        client = build_client(httpx.MockTransport(handler))
+        try:
+            return await search_channels("bitcoin", continuation=continuation, client=client)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def test_rejected_continuation_restarts_from_first_page():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            return httpx.Response(400, json={"error": {"status": "INVALID_ARGUMENT"}})
+        return httpx.Response(200, text=_first_page("bitcoin"))
+
+    channels, token = _search_with(handler, "expired")
+    assert [record.channel_id for record in channels] == [f"UC{0:022d}", f"UC{1:022d}"]
+    assert token == "token-1"
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_failed_continuation_keeps_the_token(status):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.method)
+        return httpx.Response(status)
+
+    with pytest.raises(SearchUnavailable):
+        _search_with(handler, "token-3")
+    # Retried, but never fell back to the first page.
+    assert set(requests) == {"POST"}